@@ -0,0 +1,92 @@
+# ann.py
+# Approximate nearest-neighbour search over unit-length dense vectors, in
+# NumPy only.
+#
+# Vectors are quantized to int8 with one scale per dimension (4x smaller than
+# float32) and grouped into an inverted file (IVF): spherical k-means splits
+# them into nlist clusters, stored contiguously, and a query only scans the
+# nprobe clusters whose centroids are closest to it.
+
+import numpy as np
+
+# Below this many vectors a flat scan is as fast as probing clusters.
+MIN_IVF_SIZE = 4096
+
+
+def quantize(vectors):
+    """Returns (int8 codes, float32 per-dimension scales) for a float matrix."""
+    scales = np.abs(vectors).max(axis=0) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.round(vectors / scales).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def spherical_kmeans(vectors, nlist, iterations=10, sample_size=50000, seed=0):
+    """Returns nlist unit-length centroids fitted to (a sample of) unit-length vectors."""
+    rng = np.random.default_rng(seed)
+    if vectors.shape[0] > sample_size:
+        vectors = vectors[rng.choice(vectors.shape[0], sample_size, replace=False)]
+    centroids = vectors[rng.choice(vectors.shape[0], nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        norms = np.linalg.norm(sums, axis=1)
+        # Empty clusters keep their previous centroid.
+        filled = norms > 0
+        centroids[filled] = sums[filled] / norms[filled, None]
+    return centroids
+
+
+# --- Quantized IVF Index ---
+class QuantizedIVFIndex:
+    def __init__(self, vectors, nlist=None, nprobe=None, seed=0):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        num_vectors = vectors.shape[0]
+        if nlist is None:
+            nlist = 1 if num_vectors < MIN_IVF_SIZE else int(4 * np.sqrt(num_vectors))
+        self.nlist = max(1, min(nlist, num_vectors))
+        # Probing about 1/16 of the clusters keeps recall high at a small fraction of a full scan.
+        self.nprobe = nprobe if nprobe is not None else max(1, self.nlist // 16)
+        if self.nlist > 1:
+            self.centroids = spherical_kmeans(vectors, self.nlist, seed=seed)
+            assignment = np.argmax(vectors @ self.centroids.T, axis=1)
+        else:
+            self.centroids = np.zeros((1, vectors.shape[1]), dtype=np.float32)
+            assignment = np.zeros(num_vectors, dtype=np.int64)
+        # Vectors are stored grouped by cluster; ids maps storage order back to the original rows.
+        self.ids = np.argsort(assignment, kind="stable")
+        self.positions = np.empty_like(self.ids)
+        self.positions[self.ids] = np.arange(num_vectors)
+        self.offsets = np.searchsorted(assignment[self.ids], np.arange(self.nlist + 1))
+        self.codes, self.scales = quantize(vectors[self.ids])
+
+    def __len__(self):
+        return self.ids.shape[0]
+
+    def candidates(self, query):
+        """Returns the storage positions of the vectors in the clusters nearest to query."""
+        if self.nlist == 1:
+            return np.arange(len(self))
+        nprobe = min(self.nprobe, self.nlist)
+        probes = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        return np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in probes])
+
+    def scores(self, query, positions):
+        """Returns the approximate dot products of query with the vectors at storage positions."""
+        return self.codes[positions].astype(np.float32) @ (query * self.scales)
+
+    def search(self, query, top_k):
+        """Returns (original row ids, scores) of the approximate top_k neighbours, best first."""
+        positions = self.candidates(query)
+        scores = self.scores(query, positions)
+        if top_k < scores.shape[0]:
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            best = np.arange(scores.shape[0])
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return self.ids[positions[best]], scores[best]
+
+    def scores_for_rows(self, query, rows):
+        """Returns the approximate dot products of query with the given original rows."""
+        return self.scores(query, self.positions[rows])
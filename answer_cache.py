@@ -0,0 +1,166 @@
+# answer_cache.py
+# A bounded cache of answers in front of the engine's vectorizer and scorer.
+#
+# Entries are keyed by a question's terms (its lemmas with stop words removed,
+# sorted) together with the terms of the conversation turns it was asked
+# after, so rewordings that preprocess the same way ("Where is my order?",
+# "my order, where is it") share one entry. A question with no exact entry can
+# still be answered from a near-duplicate: MinHash signatures of the term sets
+# are bucketed by LSH band, and a candidate asked in the same context whose
+# term set has a Jaccard similarity of at least `threshold` is used.
+#
+# Entries are evicted in least-recently-used order. The engine clears the
+# cache whenever its knowledge base changes.
+
+import threading
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+# A prime above every CRC32 value, so each (a * h + b) % _PRIME is a distinct hash of h.
+_PRIME = 4294967311
+
+
+class CacheEntry:
+    """A cached answer and what is needed to find it as a near-duplicate."""
+
+    def __init__(self, answer, term_set, band_keys):
+        self.answer = answer
+        self.term_set = term_set
+        self.band_keys = band_keys
+
+
+# --- Answer Cache ---
+# All methods take the cache lock, so server worker threads can share one
+# cache. `generation` changes on every clear(); callers read it before they
+# start computing an answer and pass it to put(), which drops answers that
+# were computed against a knowledge base that has since been replaced.
+class AnswerCache:
+    def __init__(self, max_entries=10000, threshold=0.8, num_perm=64, bands=16, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.bands = bands
+        self._rows = num_perm // bands
+        rng = np.random.default_rng(seed)
+        # Coefficients below 2**32 keep a * h + b within uint64 for 32-bit h.
+        self._a = rng.integers(1, 2 ** 32, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 2 ** 32, num_perm, dtype=np.uint64)
+        self._entries = OrderedDict()
+        # (band number, band bytes) -> keys of the entries with that band.
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    @staticmethod
+    def key(terms, context=()):
+        """Returns the cache key of a question's terms and its context turns' terms."""
+        return tuple(sorted(terms)), tuple(tuple(sorted(turn)) for turn in context)
+
+    def get(self, terms, context=()):
+        """Returns the cached answer for a question asked after the given context, or None."""
+        if not self.max_entries:
+            return None
+        key = self.key(terms, context)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return entry.answer
+        near_key = self._near_duplicate(key)
+        with self._lock:
+            entry = self._entries.get(near_key) if near_key is not None else None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(near_key)
+            self.near_hits += 1
+            return entry.answer
+
+    def put(self, terms, context, answer, generation):
+        """Caches an answer unless the cache was cleared since `generation` was read."""
+        if not self.max_entries:
+            return
+        key = self.key(terms, context)
+        term_set = frozenset(key[0])
+        band_keys = self._band_keys(term_set)
+        with self._lock:
+            if generation != self.generation or key in self._entries:
+                return
+            self._entries[key] = CacheEntry(answer, term_set, band_keys)
+            for band_key in band_keys:
+                self._buckets.setdefault(band_key, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(*self._entries.popitem(last=False))
+
+    def clear(self):
+        """Drops every entry; answers still being computed are not cached either."""
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+            self.generation += 1
+
+    def info(self):
+        """Returns the hit counters, hit rate and size of the cache."""
+        with self._lock:
+            lookups = self.exact_hits + self.near_hits + self.misses
+            return {
+                "exact_hits": self.exact_hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "hit_rate": (self.exact_hits + self.near_hits) / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+    def _remove(self, key, entry):
+        for band_key in entry.band_keys:
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def _band_keys(self, term_set):
+        """Returns the LSH bucket keys of a term set's MinHash signature."""
+        if not term_set:
+            return ()
+        hashes = np.fromiter((zlib.crc32(t.encode("utf-8")) for t in term_set), dtype=np.uint64,
+                             count=len(term_set))
+        signature = ((self._a[:, None] * hashes + self._b[:, None]) % _PRIME).min(axis=1)
+        rows = self._rows
+        return tuple((band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(self.bands))
+
+    def _near_duplicate(self, key):
+        """Returns the key of the most similar cached question in the same context, or None.
+
+        LSH only proposes candidates; they are checked against the exact
+        Jaccard similarity of the term sets.
+        """
+        if self.threshold >= 1.0:
+            return None
+        term_set = frozenset(key[0])
+        band_keys = self._band_keys(term_set)
+        with self._lock:
+            candidates = set()
+            for band_key in band_keys:
+                candidates.update(self._buckets.get(band_key, ()))
+            best_key, best_similarity = None, self.threshold
+            for candidate in candidates:
+                if candidate[1] != key[1]:
+                    continue
+                other = self._entries[candidate].term_set
+                similarity = len(term_set & other) / len(term_set | other)
+                if similarity >= best_similarity:
+                    best_key, best_similarity = candidate, similarity
+            return best_key
@@ -0,0 +1,88 @@
+# batch_query.py
+# Answers a file of logged questions in bulk without starting the GUI.
+#
+# Usage:
+#   python batch_query.py questions.txt --top-k 3 --output answers.jsonl
+#
+# The input may be plain text (one question per line) or JSON lines with a
+# "question" field, such as feedback_log.json.
+
+import argparse
+import json
+import sys
+from collections import deque
+
+from knowledge_base import load_knowledge_base
+from nlp_engine import EnhancedNLPEngine, check_nltk_data
+from retrieval import SCORERS
+
+
+def read_questions(path):
+    """Yields questions from a plain-text or JSON-lines file, one per line."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                try:
+                    line = json.loads(line).get("question", "")
+                except ValueError:
+                    pass
+            if line:
+                yield line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Answer a batch of questions with the FAQ engine.")
+    parser.add_argument("questions", help="File with one question per line (text or JSON lines).")
+    parser.add_argument("--faq", default="FAQ", help="FAQ JSON file or directory to load (default: FAQ).")
+    parser.add_argument("--model", help="Precompiled artifact from build_model.py, used if it matches the FAQ file.")
+    parser.add_argument("--backend", default="tfidf", choices=sorted(SCORERS), help="Retrieval backend (default: tfidf).")
+    parser.add_argument("--top-k", type=int, default=1, help="Number of answers to return per question.")
+    parser.add_argument("--chunk-size", type=int, default=1024, help="Questions scored per matrix product.")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes; more than 1 shards the FAQ matrix.")
+    parser.add_argument("--output", help="Write JSON lines here instead of stdout.")
+    args = parser.parse_args(argv)
+    if args.workers > 1:
+        # Sharding pulls in scipy and multiprocessing, so it is only imported when used.
+        from sharding import SHARDABLE, ShardedEngine
+        if args.backend not in SHARDABLE:
+            parser.error(f"--backend {args.backend} only works with --workers 1")
+
+    try:
+        check_nltk_data()
+    except LookupError:
+        sys.exit("A required NLTK dataset is missing. Please run `python download_data.py` first.")
+
+    faq_data = load_knowledge_base(args.faq)
+    if args.workers > 1:
+        engine = ShardedEngine(faq_data, workers=args.workers, backend=args.backend, artifact_path=args.model)
+    else:
+        engine = EnhancedNLPEngine(faq_data, backend=args.backend, artifact_path=args.model)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        questions = read_questions(args.questions)
+        # The engine consumes the iterator lazily, so questions are paired back up here.
+        pending = deque()
+
+        def tee():
+            for q in questions:
+                pending.append(q)
+                yield q
+
+        for results in engine.get_top_answers_batch(tee(), top_k=args.top_k, chunk_size=args.chunk_size):
+            record = {
+                "question": pending.popleft(),
+                "answers": [{"answer": answer, "score": round(score, 4)} for answer, score in results],
+            }
+            out.write(json.dumps(record) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if args.workers > 1:
+            engine.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# benchmarks/bench_preprocess.py
+# Measures preprocessing throughput in tokens per second, before and after
+# the lemma cache and the regex tokenizer.
+#
+# Run from the repository root:
+#   python -m benchmarks.bench_preprocess --faq FAQ --repeat 200
+
+import argparse
+import time
+
+import nltk
+from nltk.corpus import stopwords
+from nltk.stem import WordNetLemmatizer
+
+from knowledge_base import load_knowledge_base
+from nlp_engine import EnhancedNLPEngine
+
+
+def baseline_preprocess(text, lemmatizer, stop_words):
+    """The original _preprocess_text: Punkt tokenizer, uncached lemmatizer, joined string."""
+    tokens = nltk.word_tokenize(text.lower())
+    return " ".join(lemmatizer.lemmatize(w) for w in tokens if w.isalnum() and w not in stop_words)
+
+
+def throughput(preprocess, texts):
+    """Returns (tokens per second, outputs) for running preprocess over texts."""
+    start = time.perf_counter()
+    outputs = [preprocess(text) for text in texts]
+    elapsed = time.perf_counter() - start
+    num_tokens = sum(len(text.split()) for text in texts)
+    return num_tokens / elapsed, outputs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the engine's text preprocessing.")
+    parser.add_argument("--faq", default="FAQ", help="FAQ JSON file or directory to take text from (default: FAQ).")
+    parser.add_argument("--repeat", type=int, default=200, help="Times the FAQ text is repeated.")
+    args = parser.parse_args(argv)
+
+    faq_data = load_knowledge_base(args.faq)
+    texts = [item[field] for item in faq_data for field in ("question", "answer")] * args.repeat
+    lemmatizer = WordNetLemmatizer()
+    stop_words = set(stopwords.words('english'))
+    lemmatizer.lemmatize("warmup")  # Loads WordNet outside the timed region.
+
+    baseline_tps, reference = throughput(lambda t: baseline_preprocess(t, lemmatizer, stop_words), texts)
+    print(f"{'pipeline':>14} {'tokens/s':>10} {'speedup':>8} {'same output':>12}")
+    print(f"{'baseline':>14} {baseline_tps:>10.0f} {1.0:>8.2f} {1.0:>12.3f}")
+    for tokenizer in ("punkt", "regex"):
+        engine = EnhancedNLPEngine(faq_data, tokenizer=tokenizer)
+        tps, outputs = throughput(engine._preprocess_text, texts)
+        same = sum(a == b for a, b in zip(reference, outputs)) / len(texts)
+        print(f"{'cached+' + tokenizer:>14} {tps:>10.0f} {tps / baseline_tps:>8.2f} {same:>12.3f}")
+        print(f"{'':>14} {engine.lemma_cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
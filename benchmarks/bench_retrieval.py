@@ -0,0 +1,76 @@
+# benchmarks/bench_retrieval.py
+# Compares the brute-force TF-IDF scorer with the inverted index and the dense
+# hybrid scorer as the corpus grows. The dense scorer is approximate and ranks
+# differently, so its agreement with brute force is expected to be below 1.
+#
+# Run from the repository root:
+#   python -m benchmarks.bench_retrieval --sizes 1000 10000 100000
+
+import argparse
+import time
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from benchmarks.synthetic import make_corpus, make_queries
+from retrieval import BruteForceScorer, DenseScorer, InvertedIndexScorer
+
+
+def time_queries(scorer, query_vectors, top_k):
+    """Returns per-query latencies in milliseconds and the top result of each query."""
+    latencies, results = [], []
+    for i in range(query_vectors.shape[0]):
+        row = query_vectors[i]
+        start = time.perf_counter()
+        matches = scorer.search(row, top_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(matches)
+    return np.array(latencies), results
+
+
+def agreement(reference, candidate):
+    """Fraction of queries whose top answer matches the reference (or both score zero)."""
+    same = 0
+    for ref, cand in zip(reference, candidate):
+        ref_score = ref[0][1] if ref else 0.0
+        cand_score = cand[0][1] if cand else 0.0
+        if ref_score == 0.0 and cand_score == 0.0:
+            same += 1
+        elif ref and cand and (ref[0][0] == cand[0][0] or np.isclose(ref_score, cand_score)):
+            same += 1
+    return same / len(reference)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark retrieval backends on synthetic corpora.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    print(f"{'docs':>8} {'backend':>18} {'build ms':>9} {'mean ms':>8} {'p95 ms':>8} {'agree':>6}")
+    for size in args.sizes:
+        docs = make_corpus(size)
+        vectorizer = TfidfVectorizer()
+        doc_vectors = vectorizer.fit_transform(docs)
+        query_vectors = vectorizer.transform(make_queries(docs, args.queries))
+
+        reference = None
+        for name, factory in [
+            ("brute-force", lambda: BruteForceScorer(doc_vectors)),
+            ("inverted", lambda: InvertedIndexScorer(doc_vectors, early_termination=False)),
+            ("inverted+maxscore", lambda: InvertedIndexScorer(doc_vectors)),
+            ("dense", lambda: DenseScorer(doc_vectors, vectorizer.get_feature_names_out())),
+        ]:
+            start = time.perf_counter()
+            scorer = factory()
+            build_ms = (time.perf_counter() - start) * 1000
+            latencies, results = time_queries(scorer, query_vectors, args.top_k)
+            if reference is None:
+                reference = results
+            print(f"{size:>8} {name:>18} {build_ms:>9.1f} {latencies.mean():>8.3f} "
+                  f"{np.percentile(latencies, 95):>8.3f} {agreement(reference, results):>6.3f}")
+
+
+if __name__ == "__main__":
+    main()
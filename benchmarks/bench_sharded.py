@@ -0,0 +1,53 @@
+# benchmarks/bench_sharded.py
+# Measures batch answering throughput of the sharded engine as workers are added.
+#
+# Run from the repository root:
+#   python -m benchmarks.bench_sharded --docs 50000 --queries 20000 --workers 1 2 4 8
+
+import argparse
+import time
+
+from benchmarks.synthetic import make_corpus, make_queries
+from nlp_engine import EnhancedNLPEngine
+from sharding import ShardedEngine
+
+
+def run(engine, queries, top_k, chunk_size):
+    """Returns (questions per second, top answers) for answering all queries."""
+    start = time.perf_counter()
+    results = [row[0][0] if row else None
+               for row in engine.get_top_answers_batch(queries, top_k=top_k, chunk_size=chunk_size)]
+    return len(queries) / (time.perf_counter() - start), results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the process-pool sharded engine.")
+    parser.add_argument("--docs", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--chunk-size", type=int, default=2048)
+    args = parser.parse_args(argv)
+
+    docs = make_corpus(args.docs)
+    faq_data = [{"question": doc, "answer": f"answer {i}"} for i, doc in enumerate(docs)]
+    queries = make_queries(docs, args.queries)
+
+    start = time.perf_counter()
+    engine = EnhancedNLPEngine(faq_data)
+    train_s = time.perf_counter() - start
+    baseline_qps, reference = run(engine, queries, args.top_k, args.chunk_size)
+    print(f"{'engine':>14} {'train s':>8} {'questions/s':>12} {'speedup':>8} {'same top-1':>11}")
+    print(f"{'single':>14} {train_s:>8.2f} {baseline_qps:>12.0f} {1.0:>8.2f} {1.0:>11.3f}")
+
+    for workers in args.workers:
+        start = time.perf_counter()
+        with ShardedEngine(faq_data, workers=workers) as sharded:
+            train_s = time.perf_counter() - start
+            qps, results = run(sharded, queries, args.top_k, args.chunk_size)
+        same = sum(a == b for a, b in zip(reference, results)) / len(queries)
+        print(f"{f'sharded x{workers}':>14} {train_s:>8.2f} {qps:>12.0f} {qps / baseline_qps:>8.2f} {same:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
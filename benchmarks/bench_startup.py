@@ -0,0 +1,104 @@
+# benchmarks/bench_startup.py
+# Measures startup cost: the import time of each entry point as reported by
+# `python -X importtime` (in a fresh interpreter each run), which heavy
+# packages that import pulls in, and optionally the time until the engine is
+# built and has answered its first question.
+#
+# Run from the repository root:
+#   python -m benchmarks.bench_startup --repeat 5
+#   python -m benchmarks.bench_startup --engine --faq FAQ --model faq_model.npz
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Packages that take hundreds of milliseconds or more to import.
+HEAVY_PACKAGES = ("nltk", "sklearn", "scipy", "tkinter", "PIL")
+
+ENTRY_POINTS = ["nlp_engine", "retrieval", "knowledge_base", "build_model", "batch_query", "server", "chatbot", "chat_window"]
+
+# Run in a fresh interpreter; prints the time of each tier as JSON.
+ENGINE_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from knowledge_base import load_knowledge_base
+from nlp_engine import EnhancedNLPEngine, check_nltk_data
+imported = time.perf_counter()
+try:
+    check_nltk_data()
+except LookupError:
+    sys.exit("A required NLTK dataset is missing. Please run `python download_data.py` first.")
+engine = EnhancedNLPEngine(load_knowledge_base(sys.argv[1]), artifact_path=sys.argv[2] or None)
+built = time.perf_counter()
+engine.get_most_similar_answer(engine.questions[0])
+answered = time.perf_counter()
+print(json.dumps({"import_ms": (imported - start) * 1000, "build_ms": (built - imported) * 1000,
+                  "first_answer_ms": (answered - built) * 1000, "total_ms": (answered - start) * 1000,
+                  "from_artifact": engine.from_artifact}))
+"""
+
+
+def import_times(module):
+    """Imports module in a fresh interpreter.
+
+    Returns its cumulative import time and the time spent in each top-level
+    package's own modules, both in milliseconds. Raises RuntimeError with the
+    last line of the traceback if the import fails.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    total, packages = 0.0, {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0.0) + int(own) / 1000
+        if name == module:
+            total = int(cumulative) / 1000
+    return total, packages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark import and engine startup times.")
+    parser.add_argument("--modules", nargs="+", default=ENTRY_POINTS, help="Modules to import.")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module; the median is reported.")
+    parser.add_argument("--engine", action="store_true", help="Also time building the engine and a first answer.")
+    parser.add_argument("--faq", default="FAQ", help="Knowledge base for --engine (default: FAQ).")
+    parser.add_argument("--model", default="", help="Precompiled artifact for --engine, if any.")
+    args = parser.parse_args(argv)
+
+    print(f"{'module':>15} {'import ms':>10}  heavy packages loaded")
+    for module in args.modules:
+        try:
+            runs = [import_times(module) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"{module:>15} {'failed':>10}  {e}")
+            continue
+        median_ms = statistics.median(total for total, _ in runs)
+        packages = runs[-1][1]
+        heavy = [f"{name} ({packages[name]:.0f} ms)" for name in HEAVY_PACKAGES if name in packages]
+        print(f"{module:>15} {median_ms:>10.1f}  {', '.join(heavy) or '-'}")
+
+    if args.engine:
+        tiers = []
+        for _ in range(args.repeat):
+            result = subprocess.run([sys.executable, "-c", ENGINE_SCRIPT, args.faq, args.model],
+                                    capture_output=True, text=True)
+            if result.returncode != 0:
+                sys.exit(result.stderr.strip())
+            tiers.append(json.loads(result.stdout))
+        print()
+        print(f"{'tier':>15} {'median ms':>10}")
+        for tier in ("import_ms", "build_ms", "first_answer_ms", "total_ms"):
+            print(f"{tier[:-3]:>15} {statistics.median(t[tier] for t in tiers):>10.1f}")
+        print(f"Model loaded from artifact: {tiers[-1]['from_artifact']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/load_test.py
+# Load-tests a running server.py instance with concurrent keep-alive clients.
+#
+# Start the server, then run from the repository root:
+#   python server.py --faq FAQ &
+#   python -m benchmarks.load_test --clients 64 --requests 200
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+
+from knowledge_base import load_knowledge_base
+
+
+async def run_client(host, port, questions, num_requests, latencies, errors, seed):
+    """Sends num_requests /query requests over one connection, recording latencies in ms."""
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    session_id = f"load-{seed}"
+    try:
+        for _ in range(num_requests):
+            body = json.dumps({"question": rng.choice(questions), "session_id": session_id}).encode("utf-8")
+            start = time.perf_counter()
+            writer.write(b"POST /query HTTP/1.1\r\nHost: %s\r\nContent-Type: application/json\r\n"
+                         b"Content-Length: %d\r\n\r\n" % (host.encode("ascii"), len(body)) + body)
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            status = int(head.split(b" ", 2)[1])
+            length = next(int(line.split(b":", 1)[1]) for line in head.split(b"\r\n")
+                          if line.lower().startswith(b"content-length:"))
+            await reader.readexactly(length)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if status != 200:
+                errors[status] = errors.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run(args):
+    faq_data = load_knowledge_base(args.faq)
+    questions = [item["question"] for item in faq_data]
+    # Variations so that not every request is an exact FAQ question.
+    questions += [q.lower().rstrip("?") + " please" for q in questions]
+    latencies, errors = [], {}
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(args.host, args.port, questions, args.requests, latencies, errors, seed)
+                           for seed in range(args.clients)))
+    elapsed = time.perf_counter() - start
+    latencies = np.array(latencies)
+    print(f"{len(latencies)} requests from {args.clients} clients in {elapsed:.2f}s "
+          f"({len(latencies) / elapsed:.0f} req/s)")
+    print(f"latency ms: mean {latencies.mean():.2f}  p50 {np.percentile(latencies, 50):.2f}  "
+          f"p95 {np.percentile(latencies, 95):.2f}  p99 {np.percentile(latencies, 99):.2f}")
+    if errors:
+        print(f"non-200 responses: {errors}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test a local FAQ server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--faq", default="FAQ", help="FAQ JSON file or directory to draw questions from (default: FAQ).")
+    parser.add_argument("--clients", type=int, default=64, help="Concurrent connections.")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per connection.")
+    asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
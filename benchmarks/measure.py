@@ -0,0 +1,48 @@
+# benchmarks/measure.py
+# Measurement helpers shared by the benchmarks.
+
+import numpy as np
+from scipy.sparse import issparse
+
+
+def rss_mb():
+    """Returns the resident set size of this process in MB."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    # ru_maxrss is the peak, in KB on Linux and bytes on macOS; close enough as a fallback.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def latency_summary(samples_ms):
+    """Returns the mean, p50, p95, p99 and max of a list of latencies in milliseconds."""
+    samples = np.asarray(samples_ms)
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {"mean_ms": float(samples.mean()), "p50_ms": float(p50), "p95_ms": float(p95),
+            "p99_ms": float(p99), "max_ms": float(samples.max())}
+
+
+def array_mb(*objects):
+    """Returns the MB held by the numpy arrays and sparse matrices in objects and their attributes."""
+    seen, total = set(), 0
+    stack = list(objects)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, np.ndarray):
+            total += obj.nbytes
+        elif issparse(obj):
+            stack.extend(getattr(obj, name) for name in ("data", "indices", "indptr", "row", "col")
+                         if hasattr(obj, name))
+        elif hasattr(obj, "__dict__"):
+            stack.extend(vars(obj).values())
+        elif isinstance(obj, (list, tuple)):
+            stack.extend(x for x in obj if isinstance(x, np.ndarray) or issparse(x))
+    return total / (1024 * 1024)
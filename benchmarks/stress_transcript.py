@@ -0,0 +1,81 @@
+# benchmarks/stress_transcript.py
+# Fills the chat transcript with many messages and reports how long each frame
+# takes to add, scroll and resize, together with the process's memory use.
+#
+# Needs a display. Run from the repository root:
+#   python -m benchmarks.stress_transcript --messages 10000
+
+import argparse
+import time
+import tkinter as tk
+
+import numpy as np
+
+from benchmarks.measure import rss_mb
+from benchmarks.synthetic import make_corpus
+from transcript import RESIZE_DELAY_MS, ChatTranscript
+
+
+def frame(root, action):
+    """Runs action and lets Tk draw the result; returns the elapsed milliseconds."""
+    start = time.perf_counter()
+    action()
+    root.update()
+    return (time.perf_counter() - start) * 1000
+
+
+def report(name, samples):
+    samples = np.asarray(samples)
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    print(f"{name:>8} {len(samples):>7} {p50:>8.2f} {p95:>8.2f} {p99:>8.2f} {samples.max():>8.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stress test the virtualized chat transcript.")
+    parser.add_argument("--messages", type=int, default=10000, help="Messages to add (default: 10000).")
+    parser.add_argument("--batch", type=int, default=1, help="Messages added per frame (default: 1).")
+    parser.add_argument("--jumps", type=int, default=200, help="Random scroll positions to visit.")
+    parser.add_argument("--resizes", type=int, default=20, help="Window resizes to time.")
+    args = parser.parse_args(argv)
+
+    root = tk.Tk()
+    root.geometry("500x700")
+    transcript = ChatTranscript(root, bg="#ededed", user_color="#dcf8c6", bot_color="#ffffff",
+                                text_color="#1f1f1f", font=("Segoe UI", 11), font_small=("Segoe UI", 8))
+    transcript.pack(fill=tk.BOTH, expand=True)
+    root.update()
+    start_rss = rss_mb()
+
+    # Short questions alternate with answers of one to several sentences.
+    texts = make_corpus(args.messages, vocab_size=5000, doc_length=(3, 80))
+
+    def add_batch(start):
+        for i in range(start, min(start + args.batch, args.messages)):
+            is_user = i % 2 == 0
+            transcript.add_message("You" if is_user else "Bot", texts[i], show_feedback=not is_user)
+
+    add_times = [frame(root, lambda s=s: add_batch(s)) for s in range(0, args.messages, args.batch)]
+
+    rng = np.random.default_rng(0)
+    scroll_times = [frame(root, lambda p=p: transcript.canvas.yview_moveto(p)) for p in rng.random(args.jumps)]
+
+    resize_times = []
+    for i in range(args.resizes):
+        width = 450 + 250 * (i % 2)
+        root.geometry(f"{width}x700")
+        root.update()
+        # Resizes are debounced; wait out the delay, then time the re-layout and redraw.
+        time.sleep(RESIZE_DELAY_MS / 1000)
+        resize_times.append(frame(root, lambda: None))
+
+    print(f"{'frame':>8} {'count':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    report("add", add_times)
+    report("scroll", scroll_times)
+    report("resize", resize_times)
+    print(f"messages: {len(transcript.messages)}, canvas items: {len(transcript.canvas.find_all())}, "
+          f"RSS: {rss_mb():.1f} MB (+{rss_mb() - start_rss:.1f} MB)")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
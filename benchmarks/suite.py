@@ -0,0 +1,205 @@
+# benchmarks/suite.py
+# End-to-end speed and answer-quality benchmark of the engine on synthetic
+# FAQ sets, written to JSON so that runs can be compared.
+#
+# For each corpus size and retrieval backend it records build time, memory,
+# per-query latency (with per-stage percentiles), batch throughput, top-1 and
+# top-k accuracy on paraphrased questions, how often unanswerable questions
+# get an answer at a range of similarity thresholds, and follow-up accuracy
+# for a range of context decays. Everything is generated from fixed seeds.
+#
+# Run from the repository root:
+#   python -m benchmarks.suite --sizes 1000 10000 100000 --output bench.json
+#   python -m benchmarks.suite --sizes 1000 10000 --baseline bench.json
+
+import argparse
+import json
+import platform
+import sys
+import time
+from multiprocessing import Pool
+
+import numpy as np
+import scipy
+import sklearn
+
+from benchmarks.measure import array_mb, latency_summary, rss_mb
+from benchmarks.synthetic import make_faq, make_follow_ups, make_paraphrases, make_unanswerable
+from nlp_engine import CONTEXT_DECAY, CONTEXT_TURNS, SIMILARITY_THRESHOLD, EnhancedNLPEngine
+from retrieval import SCORERS
+
+THRESHOLDS = [0.05, 0.1, 0.15, 0.2, 0.25, 0.3, 0.4, 0.5]
+CONTEXT_DECAYS = [0.0, 0.25, 0.5, 0.75, 1.0]
+
+
+def top_answers(engine, queries, top_k, answer_ids):
+    """Returns each query's top-k (FAQ index, score) list and the throughput in questions per second."""
+    start = time.perf_counter()
+    results = [[(answer_ids[answer], score) for answer, score in row]
+               for row in engine.get_top_answers_batch(queries, top_k=top_k)]
+    return results, len(queries) / (time.perf_counter() - start)
+
+
+def accuracy(results, targets, equivalent, k):
+    """Fraction of queries whose target (or an FAQ with the same question) is in the top k."""
+    hits = sum(any(equivalent[index] == equivalent[target] for index, _ in row[:k])
+               for row, target in zip(results, targets))
+    return hits / len(targets)
+
+
+def threshold_sweep(results, targets, equivalent, unanswerable_results):
+    """Answered, correct and false-answer rates for each candidate SIMILARITY_THRESHOLD."""
+    top = np.array([row[0][1] if row else 0.0 for row in results])
+    correct = np.array([bool(row) and equivalent[row[0][0]] == equivalent[t] for row, t in zip(results, targets)])
+    unanswerable = np.array([row[0][1] if row else 0.0 for row in unanswerable_results])
+    return [{
+        "threshold": threshold,
+        "answered": float((top > threshold).mean()),
+        "correct": float(((top > threshold) & correct).mean()),
+        "false_answers": float((unanswerable > threshold).mean()),
+    } for threshold in THRESHOLDS]
+
+
+def context_sweep(engine, first, follow_ups, targets, equivalent, answer_ids):
+    """Accuracy of follow-up questions for each candidate context decay."""
+    sweep = []
+    original = engine.context_decay
+    for decay in CONTEXT_DECAYS:
+        engine.context_decay = decay
+        correct = 0
+        for i, (question, follow_up, target) in enumerate(zip(first, follow_ups, targets)):
+            session_id = f"bench-context-{decay}-{i}"
+            engine.get_most_similar_answer(question, session_id)
+            index = answer_ids.get(engine.get_most_similar_answer(follow_up, session_id))
+            correct += index is not None and equivalent[index] == equivalent[target]
+            engine.clear_history(session_id)
+        sweep.append({"context_decay": decay, "follow_up_accuracy": correct / len(targets)})
+    engine.context_decay = original
+    return sweep
+
+
+def run(faq_data, backend, args, pool):
+    """Builds an engine for one backend and measures it."""
+    answer_ids = {item["answer"]: i for i, item in enumerate(faq_data)}
+    # FAQs that share a question are interchangeable for accuracy purposes.
+    first_with_question = {}
+    equivalent = [first_with_question.setdefault(item["question"], i) for i, item in enumerate(faq_data)]
+    queries, targets = make_paraphrases(faq_data, args.queries, seed=args.seed + 1)
+    unanswerable = make_unanswerable(args.queries, seed=args.seed + 3)
+    first, follow_ups, follow_up_targets = make_follow_ups(faq_data, args.conversations, seed=args.seed + 2)
+
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    # The answer cache would make repeated measurements meaningless.
+    engine = EnhancedNLPEngine(faq_data, backend=backend, tokenizer=args.tokenizer, answer_cache_size=0, pool=pool)
+    build_s = time.perf_counter() - start
+    memory = {"index_mb": array_mb(engine.index), "rss_delta_mb": rss_mb() - rss_before}
+
+    latencies = []
+    for i, query in enumerate(queries[:args.latency_queries]):
+        start = time.perf_counter()
+        # A fresh session per query, so no conversation context is mixed in.
+        engine.get_most_similar_answer(query, f"bench-{i}")
+        latencies.append((time.perf_counter() - start) * 1000)
+        engine.clear_history(f"bench-{i}")
+    stages = engine.latency_stats()
+
+    results, throughput = top_answers(engine, queries, args.top_k, answer_ids)
+    unanswerable_results, _ = top_answers(engine, unanswerable, 1, answer_ids)
+    return {
+        "size": len(faq_data),
+        "backend": backend,
+        "build_s": build_s,
+        "memory": memory,
+        "latency": latency_summary(latencies),
+        "stages": stages,
+        "throughput_qps": throughput,
+        "top1_accuracy": accuracy(results, targets, equivalent, 1),
+        f"top{args.top_k}_accuracy": accuracy(results, targets, equivalent, args.top_k),
+        "thresholds": threshold_sweep(results, targets, equivalent, unanswerable_results),
+        "context": context_sweep(engine, first, follow_ups, follow_up_targets, equivalent, answer_ids),
+    }
+
+
+def compare(results, baseline, max_slowdown, max_accuracy_drop):
+    """Prints regressions against a baseline run; returns True if there were any."""
+    previous = {(r["size"], r["backend"]): r for r in baseline["results"]}
+    regressed = False
+    for result in results:
+        old = previous.get((result["size"], result["backend"]))
+        if old is None:
+            continue
+        checks = [
+            ("p95 latency", old["latency"]["p95_ms"], result["latency"]["p95_ms"],
+             result["latency"]["p95_ms"] > old["latency"]["p95_ms"] * max_slowdown),
+            ("throughput", old["throughput_qps"], result["throughput_qps"],
+             result["throughput_qps"] * max_slowdown < old["throughput_qps"]),
+            ("build time", old["build_s"], result["build_s"], result["build_s"] > old["build_s"] * max_slowdown),
+            ("top-1 accuracy", old["top1_accuracy"], result["top1_accuracy"],
+             result["top1_accuracy"] < old["top1_accuracy"] - max_accuracy_drop),
+        ]
+        for name, before, after, failed in checks:
+            if failed:
+                regressed = True
+                print(f"REGRESSION {result['backend']} @ {result['size']}: {name} {before:.4g} -> {after:.4g}")
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark engine speed and accuracy on synthetic FAQ sets.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="FAQ entries per corpus, e.g. 1000 up to 1000000.")
+    parser.add_argument("--backends", nargs="+", default=sorted(SCORERS), choices=sorted(SCORERS))
+    parser.add_argument("--queries", type=int, default=2000, help="Paraphrased and unanswerable queries.")
+    parser.add_argument("--latency-queries", type=int, default=500, help="Queries timed one at a time.")
+    parser.add_argument("--conversations", type=int, default=300, help="Two-turn conversations per decay.")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--tokenizer", default="punkt", choices=["punkt", "regex"])
+    parser.add_argument("--workers", type=int, default=1, help="Processes used to preprocess the FAQ set.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="Earlier --output file to check for regressions against.")
+    parser.add_argument("--max-slowdown", type=float, default=1.25,
+                        help="Allowed ratio of latency, throughput and build time to the baseline.")
+    parser.add_argument("--max-accuracy-drop", type=float, default=0.01)
+    args = parser.parse_args(argv)
+
+    pool = Pool(args.workers) if args.workers > 1 else None
+    results = []
+    try:
+        print(f"{'size':>8} {'backend':>9} {'build s':>8} {'index MB':>9} {'p50 ms':>7} {'p95 ms':>7} "
+              f"{'q/s':>8} {'top-1':>6} {f'top-{args.top_k}':>6}")
+        for size in args.sizes:
+            faq_data = make_faq(size, seed=args.seed)
+            for backend in args.backends:
+                r = run(faq_data, backend, args, pool)
+                results.append(r)
+                print(f"{size:>8} {backend:>9} {r['build_s']:>8.2f} {r['memory']['index_mb']:>9.1f} "
+                      f"{r['latency']['p50_ms']:>7.2f} {r['latency']['p95_ms']:>7.2f} {r['throughput_qps']:>8.0f} "
+                      f"{r['top1_accuracy']:>6.3f} {r[f'top{args.top_k}_accuracy']:>6.3f}")
+    finally:
+        if pool is not None:
+            pool.close()
+
+    report = {
+        "config": vars(args),
+        "defaults": {"similarity_threshold": SIMILARITY_THRESHOLD, "context_turns": CONTEXT_TURNS,
+                     "context_decay": CONTEXT_DECAY},
+        "environment": {"python": sys.version.split()[0], "platform": platform.platform(),
+                        "numpy": np.__version__, "scipy": scipy.__version__, "sklearn": sklearn.__version__},
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.max_slowdown, args.max_accuracy_drop):
+            sys.exit(1)
+        print("No regressions against", args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# benchmarks/synthetic.py
+# Generates synthetic, already-lemmatized FAQ text for the benchmarks.
+
+import numpy as np
+
+
+def make_vocabulary(size, seed=0):
+    """Returns a list of distinct pseudo-words."""
+    rng = np.random.default_rng(seed)
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    words = set()
+    while len(words) < size:
+        length = rng.integers(3, 10)
+        words.add("".join(rng.choice(letters, length)))
+    return sorted(words)
+
+
+def make_corpus(num_docs, vocab_size=20000, doc_length=(4, 10), seed=0):
+    """Returns num_docs space-joined documents with Zipf-distributed words."""
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array(make_vocabulary(vocab_size, seed))
+    ranks = np.arange(1, vocab_size + 1)
+    probabilities = 1.0 / ranks
+    probabilities /= probabilities.sum()
+    lengths = rng.integers(doc_length[0], doc_length[1] + 1, num_docs)
+    word_ids = rng.choice(vocab_size, lengths.sum(), p=probabilities)
+    docs, start = [], 0
+    for length in lengths:
+        docs.append(" ".join(vocabulary[word_ids[start:start + length]]))
+        start += length
+    return docs
+
+
+def make_queries(docs, num_queries, keep=0.7, seed=1):
+    """Returns queries made from random documents with some of their words dropped."""
+    rng = np.random.default_rng(seed)
+    queries = []
+    for doc_id in rng.integers(0, len(docs), num_queries):
+        words = docs[doc_id].split()
+        kept = [w for w in words if rng.random() < keep] or words[:1]
+        queries.append(" ".join(kept))
+    return queries
+
+
+# Phrasings wrapped around synthetic questions and queries, so that the
+# tokenizer and stop word removal have real work to do.
+QUESTION_TEMPLATES = ["how do i {}?", "what is the {}?", "can i {}?", "where are my {}?", "{}"]
+QUERY_FILLERS = ["", "hi, ", "please tell me ", "i want to know ", "quick question: "]
+
+
+def make_faq(num_entries, vocab_size=20000, question_length=(4, 10), seed=0):
+    """Returns num_entries {"question", "answer"} entries with unique answers."""
+    rng = np.random.default_rng(seed)
+    docs = make_corpus(num_entries, vocab_size, question_length, seed)
+    templates = rng.integers(0, len(QUESTION_TEMPLATES), num_entries)
+    return [{"question": QUESTION_TEMPLATES[t].format(doc), "answer": f"Answer {i}: {doc}."}
+            for i, (doc, t) in enumerate(zip(docs, templates))]
+
+
+def _content_words(entry):
+    """Returns the corpus words behind a make_faq entry, without the question template."""
+    return entry["answer"].split(": ", 1)[1].rstrip(".").split()
+
+
+def _paraphrase(words, rng, vocabulary, keep, noise):
+    kept = [w for w in words if rng.random() < keep] or [words[rng.integers(len(words))]]
+    rng.shuffle(kept)
+    kept += [vocabulary[rng.integers(len(vocabulary))] for _ in words if rng.random() < noise]
+    return QUERY_FILLERS[rng.integers(len(QUERY_FILLERS))] + " ".join(kept) + "?"
+
+
+def make_paraphrases(faq_data, num_queries, keep=0.7, noise=0.1, vocab_size=20000, seed=1):
+    """Returns (queries, target FAQ indices): reworded make_faq questions.
+
+    Each query keeps a random subset of its question's content words (at
+    least one), in shuffled order, behind a filler phrase, with a random
+    vocabulary word added with probability `noise` per word.
+    """
+    rng = np.random.default_rng(seed)
+    vocabulary = make_vocabulary(vocab_size, 0)
+    targets = [int(t) for t in rng.integers(0, len(faq_data), num_queries)]
+    queries = [_paraphrase(_content_words(faq_data[t]), rng, vocabulary, keep, noise) for t in targets]
+    return queries, targets
+
+
+def make_follow_ups(faq_data, num_conversations, words=1, vocab_size=20000, seed=2):
+    """Returns (first questions, follow-ups, target FAQ indices) for two-turn conversations.
+
+    The first question is a paraphrase; the follow-up repeats only `words`
+    of the same FAQ's words, so it is usually ambiguous on its own and
+    relies on the first turn as context.
+    """
+    rng = np.random.default_rng(seed)
+    vocabulary = make_vocabulary(vocab_size, 0)
+    targets = [int(t) for t in rng.integers(0, len(faq_data), num_conversations)]
+    first, follow_ups = [], []
+    for target in targets:
+        content = _content_words(faq_data[target])
+        first.append(_paraphrase(content, rng, vocabulary, keep=0.7, noise=0.1))
+        follow_ups.append("and " + " ".join(rng.choice(content, min(words, len(content)), replace=False)) + "?")
+    return first, follow_ups, targets
+
+
+def make_unanswerable(num_queries, vocab_size=20000, length=(3, 8), seed=3):
+    """Returns queries made only of words that appear in no FAQ of the same vocab_size."""
+    known = set(make_vocabulary(vocab_size, 0))
+    rng = np.random.default_rng(seed)
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    queries = []
+    for _ in range(num_queries):
+        num_words, words = rng.integers(length[0], length[1] + 1), []
+        while len(words) < num_words:
+            word = "".join(rng.choice(letters, rng.integers(3, 10)))
+            if word not in known:
+                words.append(word)
+        queries.append(" ".join(words) + "?")
+    return queries
@@ -0,0 +1,38 @@
+# build_model.py
+# Compiles an FAQ file into a precompiled model artifact for fast startup.
+#
+# Usage:
+#   python build_model.py --faq FAQ --output faq_model.npz
+#
+# The engine loads the artifact instead of re-training as long as the FAQ
+# data it was built from has not changed and it uses the same --tokenizer.
+
+import argparse
+import sys
+
+from knowledge_base import load_knowledge_base
+from model_artifact import save_artifact
+from nlp_engine import EnhancedNLPEngine, check_nltk_data
+from text_processing import TOKENIZERS
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile the FAQ set into a precompiled model artifact.")
+    parser.add_argument("--faq", default="FAQ", help="FAQ JSON file or directory to compile (default: FAQ).")
+    parser.add_argument("--output", default="faq_model.npz", help="Artifact path (default: faq_model.npz).")
+    parser.add_argument("--tokenizer", default="punkt", choices=sorted(TOKENIZERS),
+                        help="Tokenizer of the engines that will load the artifact (default: punkt).")
+    args = parser.parse_args(argv)
+
+    try:
+        check_nltk_data()
+    except LookupError:
+        sys.exit("A required NLTK dataset is missing. Please run `python download_data.py` first.")
+
+    engine = EnhancedNLPEngine(load_knowledge_base(args.faq), tokenizer=args.tokenizer)
+    save_artifact(engine, args.output)
+    print(f"Wrote {args.output}: {len(engine.answers)} FAQs, {len(engine.vectorizer.vocabulary_)} terms.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+# chat_window.py
+# The Tkinter chat window. chatbot.py imports it only when a window is opened,
+# so the headless console chat runs on machines without Tk.
+
+import tkinter as tk
+from tkinter import messagebox
+from importlib.util import find_spec
+import threading
+import time
+import traceback
+
+from feedback import FeedbackWriter
+from knowledge_base import KnowledgeBaseWatcher
+from transcript import ChatTranscript
+
+
+# Pillow is only checked for here; importing it would slow down startup.
+PILLOW_INSTALLED = find_spec("PIL") is not None
+
+# --- The Professional Chat Application Class ---
+# This class builds and manages the entire graphical user interface.
+class ChatApplication(tk.Tk):
+    def __init__(self, load_engine, faq_path="FAQ", nltk_missing_message=""):
+        super().__init__()
+        if not PILLOW_INSTALLED:
+            messagebox.showerror("Pillow Library Missing", "The 'Pillow' library is recommended. Please install it using: pip install Pillow")
+        
+        # load_engine(faq_path) builds the engine; it raises LookupError if NLTK data is missing.
+        self.engine_loader = load_engine
+        self.faq_path = faq_path
+        self.nltk_missing_message = nltk_missing_message
+        # Set by _on_engine_ready once the background thread has built the engine.
+        self.nlp_engine = None
+        self.watcher = None
+        # Feedback is written on a background thread so clicks never wait for the disk.
+        self.feedback_writer = FeedbackWriter("feedback_log.json")
+        # Message id of each bot answer -> the question it replied to, for feedback.
+        self.answered_questions = {}
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.title("Intelligent FAQ Assistant")
+        self.geometry("500x700")
+        self.minsize(450, 600)
+
+        # --- UI Theme and Asset Configuration ---
+        self.BG_COLOR = "#ededed"
+        self.USER_BUBBLE_COLOR = "#dcf8c6"
+        self.BOT_BUBBLE_COLOR = "#ffffff"
+        self.TEXT_COLOR = "#1f1f1f"
+        self.HEADER_COLOR = "#005e54"
+        self.FONT = ("Segoe UI", 11)
+        self.FONT_SMALL = ("Segoe UI", 8)
+
+        self._setup_ui()
+        self._set_loading(True)
+        threading.Thread(target=self._load_engine, name="engine-loader", daemon=True).start()
+
+    def _setup_ui(self):
+        """ the main UI elements of the application."""
+        # --- Header ---
+        header_frame = tk.Frame(self, bg=self.HEADER_COLOR, height=60)
+        header_frame.pack(fill=tk.X, side=tk.TOP)
+        header_frame.pack_propagate(False)
+
+        title_label = tk.Label(header_frame, text="Intelligent FAQ Assistant", font=("Segoe UI", 14, "bold"), bg=self.HEADER_COLOR, fg="white")
+        title_label.pack(side=tk.LEFT, padx=15, pady=10)
+
+        self.status_label = tk.Label(header_frame, font=self.FONT_SMALL, bg=self.HEADER_COLOR, fg="#cce5e2")
+        self.status_label.pack(side=tk.LEFT, pady=10)
+        
+        clear_button = tk.Button(header_frame, text="Clear", font=("Segoe UI", 10), command=self.clear_chat, relief=tk.FLAT, bg=self.HEADER_COLOR, fg="white", activebackground="#007a6e", activeforeground="white", bd=0, cursor="hand2")
+        clear_button.pack(side=tk.RIGHT, padx=15)
+
+        # --- Chat Area with Scrolling ---
+        # Bubbles are drawn on a canvas and only the visible ones exist at any time,
+        # so long conversations stay fast to scroll and resize (see transcript.py).
+        self.transcript = ChatTranscript(self, bg=self.BG_COLOR, user_color=self.USER_BUBBLE_COLOR,
+                                         bot_color=self.BOT_BUBBLE_COLOR, text_color=self.TEXT_COLOR,
+                                         font=self.FONT, font_small=self.FONT_SMALL, on_feedback=self.log_feedback)
+        self.transcript.pack(fill=tk.BOTH, expand=True)
+
+        # --- Message Input Footer ---
+        footer_frame = tk.Frame(self, bg="#f0f0f0", height=60)
+        footer_frame.pack(fill=tk.X, side=tk.BOTTOM, pady=5, padx=10)
+        footer_frame.grid_propagate(False)
+        footer_frame.grid_columnconfigure(0, weight=1)
+
+        self.user_entry = tk.Text(footer_frame, height=1, bg="white", fg=self.TEXT_COLOR, font=self.FONT,
+                                  padx=15, pady=10, relief=tk.SOLID, insertbackground=self.TEXT_COLOR, bd=1, highlightthickness=0)
+        self.user_entry.grid(row=0, column=0, sticky="nsew", padx=(0,10), pady=10)
+        self.user_entry.bind("<Return>", self._on_enter_pressed)
+        self.user_entry.bind("<KeyRelease>", self._on_text_change)
+
+        self.send_button = tk.Button(footer_frame, text="Send", bg=self.HEADER_COLOR, fg="white",
+                                     activebackground="#007a6e", activeforeground="white", 
+                                     font=("Segoe UI", 10, "bold"), command=self.send_message_thread,
+                                     borderwidth=0, relief=tk.FLAT, cursor="hand2", padx=10)
+        self.send_button.grid(row=0, column=1, pady=10, sticky="ns")
+
+    def _set_loading(self, loading):
+        """Shows or hides the loading state; the input is disabled while the model loads."""
+        self.status_label.config(text="Loading model..." if loading else "")
+        state = tk.DISABLED if loading else tk.NORMAL
+        self.user_entry.config(state=state)
+        self.send_button.config(state=state)
+
+    def _load_engine(self):
+        """Builds the engine on the background thread and hands the result to the GUI thread."""
+        try:
+            nlp_engine = self.engine_loader(self.faq_path)
+        except LookupError:
+            self._schedule(self._on_engine_failed, "NLTK Data Missing", self.nltk_missing_message)
+        except (OSError, ValueError) as e:
+            self._schedule(self._on_engine_failed, "Knowledge Base Error", f"The knowledge base could not be loaded:\n{e}")
+        except Exception as e:
+            # Anything else (e.g. a malformed FAQ entry) must not leave the window stuck loading.
+            traceback.print_exc()
+            self._schedule(self._on_engine_failed, "Model Loading Error",
+                           f"The model could not be built:\n{type(e).__name__}: {e}")
+        else:
+            self._schedule(self._on_engine_ready, nlp_engine)
+
+    def _schedule(self, callback, *args):
+        """Runs callback on the GUI thread, unless the window has been closed meanwhile."""
+        try:
+            self.after(0, callback, *args)
+        except (RuntimeError, tk.TclError):
+            pass
+
+    def _on_engine_ready(self, nlp_engine):
+        """Enables the chat once the engine is ready."""
+        self.nlp_engine = nlp_engine
+        # The knowledge base is reloaded into the running engine whenever it changes.
+        self.watcher = KnowledgeBaseWatcher(nlp_engine, self.faq_path).start()
+        self._set_loading(False)
+        self.user_entry.focus_set()
+        self._add_message_to_gui("Bot", "Hello! I'm your intelligent FAQ assistant. How can I help you today?")
+
+    def _on_engine_failed(self, title, message):
+        """Reports why the engine could not be built and closes the window."""
+        messagebox.showerror(title, message)
+        self._on_close()
+
+    def _on_enter_pressed(self, event):
+        """Handles the Enter key press to send a message."""
+        self.send_message_thread()
+        return "break"
+
+    def _on_text_change(self, event):
+        """Auto-adjusts the height of the text entry box based on content."""
+        num_lines = self.user_entry.count("1.0", "end-1c", "displaylines") or 1
+        self.user_entry.config(height=min(num_lines, 4))
+
+    def send_message_thread(self):
+        """Initiates message processing in a separate thread to keep the UI responsive."""
+        user_input = self.user_entry.get("1.0", tk.END).strip()
+        if user_input:
+            self._add_message_to_gui("You", user_input)
+            self.user_entry.delete("1.0", tk.END)
+            self.user_entry.config(state=tk.DISABLED)
+            
+            threading.Thread(target=self.process_bot_response, args=(user_input, time.perf_counter()),
+                             daemon=True).start()
+
+    def process_bot_response(self, user_input, sent_at=None):
+        """Handles the logic of getting and displaying the bot's response."""
+        self.after(100, self.show_typing_indicator)
+        
+        bot_response = self.nlp_engine.get_most_similar_answer(user_input)
+        answered_at = time.perf_counter()
+        
+        self.after(500, self.remove_typing_indicator)
+        self.after(600, self._show_bot_response, user_input, bot_response, sent_at, answered_at)
+        self.after(600, lambda: self.user_entry.config(state=tk.NORMAL))
+
+    def _show_bot_response(self, user_input, bot_response, sent_at, answered_at):
+        """Displays the answer and records how long the user waited for it."""
+        message_id = self._add_message_to_gui("Bot", bot_response, True)
+        self.answered_questions[message_id] = user_input
+        stats, now = self.nlp_engine.instrumentation, time.perf_counter()
+        # gui_wait is the time between the engine answering and the answer appearing on screen.
+        stats.record("gui_wait", now - answered_at)
+        if sent_at is not None:
+            stats.record("gui_response", now - sent_at)
+
+    def _add_message_to_gui(self, sender, message, show_feedback=False):
+        """Adds a chat bubble to the transcript and scrolls to it; returns its message id."""
+        return self.transcript.add_message(sender, message, show_feedback)
+
+    def log_feedback(self, message_id, feedback_type):
+        """Logs user feedback; the transcript has already swapped the buttons for a thank-you note."""
+        # Rated against the question this answer replied to, not the most recent one.
+        question = self.answered_questions.get(message_id, "N/A")
+        # The message id identifies the answer, so repeated clicks on it are dropped.
+        self.feedback_writer.log(question, feedback_type, answer_id=message_id)
+
+    def show_typing_indicator(self):
+        """Displays a 'Bot is typing...' bubble."""
+        self.transcript.show_typing()
+
+    def remove_typing_indicator(self):
+        """Removes the typing indicator bubble."""
+        self.transcript.hide_typing()
+
+    def _on_close(self):
+        """Stops the knowledge base watcher and flushes pending feedback before the window closes."""
+        if self.watcher is not None:
+            self.watcher.stop()
+        self.feedback_writer.close()
+        self.destroy()
+
+    def clear_chat(self):
+        """Clears the chat window and conversation history."""
+        if messagebox.askyesno("Confirm Clear", "Are you sure you want to clear the entire chat history?"):
+            if self.nlp_engine is not None:
+                self.nlp_engine.clear_history()
+            self.transcript.clear()
+            self.answered_questions.clear()
+
+            self.after(100, lambda: self._add_message_to_gui("Bot", "Chat cleared! How can I help you now?"))
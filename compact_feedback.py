@@ -0,0 +1,96 @@
+# compact_feedback.py
+# Rolls rotated feedback logs up into per-question aggregate counts.
+#
+# Usage:
+#   python compact_feedback.py --log feedback_log.json --summary feedback_summary.json
+#
+# Every rotated "<log>.<timestamp>" file is added to the summary and then
+# deleted (or kept with --keep), so reports only ever read the summary. The
+# active log is never touched: the running FeedbackWriter may still append to
+# it, and it is compacted once the writer has rotated it.
+
+import argparse
+import glob
+import json
+import os
+
+
+def load_summary(path):
+    """Returns the existing summary, or an empty one."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"questions": {}, "compacted_files": []}
+
+
+def save_summary(summary, path):
+    """Writes the summary to a temporary file and renames it into place."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def add_log(summary, path):
+    """Adds the records of one JSON-lines log to the summary; returns how many were read."""
+    counts = summary["questions"]
+    read = 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(record, dict):
+                continue
+            entry = counts.setdefault(record.get("question", "N/A"), {"positive": 0, "negative": 0, "last_seen": None})
+            feedback = record.get("feedback")
+            if feedback in ("positive", "negative"):
+                entry[feedback] += 1
+            timestamp = record.get("timestamp")
+            if timestamp and (entry["last_seen"] is None or timestamp > entry["last_seen"]):
+                entry["last_seen"] = timestamp
+            read += 1
+    return read
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compact feedback logs into per-question counts.")
+    parser.add_argument("--log", default="feedback_log.json", help="Active feedback log (default: feedback_log.json).")
+    parser.add_argument("--summary", default="feedback_summary.json", help="Summary file to update.")
+    parser.add_argument("--keep", action="store_true", help="Keep compacted log files instead of deleting them.")
+    args = parser.parse_args(argv)
+
+    summary = load_summary(args.summary)
+    done = set(summary["compacted_files"])
+    own_files = {os.path.abspath(args.summary), os.path.abspath(args.summary + ".tmp")}
+    paths = [path for path in sorted(glob.glob(glob.escape(args.log) + ".*"))
+             if os.path.abspath(path) not in own_files]
+
+    total, compacted = 0, []
+    for path in paths:
+        name = os.path.basename(path)
+        if name in done:
+            continue
+        total += add_log(summary, path)
+        compacted.append(path)
+        # Recorded even if the file is about to be deleted, so it is not counted
+        # again should this run stop before the deletion.
+        summary["compacted_files"].append(name)
+
+    # The summary is saved before any log is removed, so a crash cannot lose counts.
+    save_summary(summary, args.summary)
+
+    if not args.keep:
+        # This includes logs compacted by an earlier run that stopped before deleting them.
+        for path in paths:
+            os.remove(path)
+    names = {os.path.basename(path) for path in glob.glob(glob.escape(args.log) + ".*")}
+    summary["compacted_files"] = [name for name in summary["compacted_files"] if name in names]
+    save_summary(summary, args.summary)
+    print(f"Compacted {total} records from {len(compacted)} files into {args.summary}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# feedback.py
+# Writes feedback records on a background thread so that callers (the Tk main
+# thread, the server's event loop) never wait for the disk.
+#
+# Records are appended as JSON lines, in batches. The file is fsynced at most
+# every fsync_interval seconds and rotated to "<path>.<YYYYmmdd-HHMMSS>" when
+# it grows past max_bytes or the day changes. Rotated files can be rolled up
+# with compact_feedback.py.
+
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+
+def rotated_path(path, now):
+    """Returns an unused "<path>.<timestamp>" name for a rotated log."""
+    candidate = base = f"{path}.{now.strftime('%Y%m%d-%H%M%S')}"
+    counter = 1
+    while os.path.exists(candidate):
+        candidate = f"{base}-{counter}"
+        counter += 1
+    return candidate
+
+
+# --- Feedback Writer ---
+class FeedbackWriter:
+    def __init__(self, path="feedback_log.json", flush_interval=0.5, fsync_interval=5.0,
+                 max_bytes=10 * 1024 * 1024, rotate_daily=True, dedupe_window=5.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.dedupe_window = dedupe_window
+        self._queue = queue.SimpleQueue()
+        self._recent = {}
+        self._recent_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="feedback-writer", daemon=True)
+        self._thread.start()
+
+    def log(self, question, feedback, answer_id=None):
+        """Queues one feedback record; returns False if it was a repeated click.
+
+        Clicks with the same answer_id (or, without one, the same question)
+        and the same feedback within dedupe_window seconds are dropped.
+        """
+        now = time.monotonic()
+        key = (answer_id if answer_id is not None else question, feedback)
+        with self._recent_lock:
+            if now - self._recent.get(key, float("-inf")) < self.dedupe_window:
+                return False
+            self._recent[key] = now
+            if len(self._recent) > 1000:
+                self._recent = {k: t for k, t in self._recent.items() if now - t < self.dedupe_window}
+        self._queue.put({"timestamp": datetime.now().isoformat(), "question": question, "feedback": feedback})
+        return True
+
+    def close(self):
+        """Writes out everything queued so far and stops the background thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        f, opened_on = None, None
+        dirty, last_fsync = False, time.monotonic()
+        running = True
+        while running:
+            batch = []
+            try:
+                record = self._queue.get(timeout=self.flush_interval)
+                # Drain whatever else has arrived, so a burst becomes a single write.
+                while record is not None:
+                    batch.append(record)
+                    record = self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            else:
+                running = False
+            try:
+                if batch:
+                    if f is None:
+                        f, opened_on = self._open_file()
+                    if self._should_rotate(f, opened_on):
+                        self._close_file(f)
+                        os.replace(self.path, rotated_path(self.path, datetime.now()))
+                        f, opened_on = self._open_file()
+                    f.write("".join(json.dumps(r) + "\n" for r in batch))
+                    f.flush()
+                    dirty = True
+                if dirty and (not running or time.monotonic() - last_fsync >= self.fsync_interval):
+                    os.fsync(f.fileno())
+                    dirty, last_fsync = False, time.monotonic()
+            except OSError as e:
+                print(f"Error writing to feedback log: {e}")
+                if f is not None:
+                    f.close()
+                f, dirty = None, False
+        if f is not None:
+            self._close_file(f)
+
+    def _open_file(self):
+        """Opens the log for appending; returns it with the day it was started on."""
+        try:
+            started = datetime.fromtimestamp(os.path.getmtime(self.path)).date()
+        except OSError:
+            started = datetime.now().date()
+        return open(self.path, "a", encoding="utf-8"), started
+
+    def _should_rotate(self, f, opened_on):
+        return f.tell() >= self.max_bytes or (self.rotate_daily and datetime.now().date() != opened_on)
+
+    @staticmethod
+    def _close_file(f):
+        try:
+            os.fsync(f.fileno())
+        finally:
+            f.close()
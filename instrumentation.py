@@ -0,0 +1,204 @@
+# instrumentation.py
+# Per-stage latency histograms and a sampling profiler for the query path.
+#
+# Each stage (tokenize, lemmatize, transform, score, ...) records its duration
+# into a log-linear histogram in the style of HdrHistogram: recording is one
+# bucket increment, memory is fixed, and percentiles are accurate to within 2%
+# at any scale. Every profile_every-th query can also be run under cProfile
+# and dumped to profile_dir for inspection with pstats or snakeviz.
+
+import cProfile
+import os
+import threading
+import time
+from itertools import count
+
+# Sub-buckets per power of two: values are kept to 6 significant bits (~1.6% error).
+_SUB_BUCKET_BITS = 6
+_SUB_BUCKETS = 1 << _SUB_BUCKET_BITS
+_HALF = _SUB_BUCKETS // 2
+# Values are recorded in microseconds and capped at 2**36 us (about 19 hours).
+_MAX_VALUE = (1 << 36) - 1
+
+
+def _bucket_index(value):
+    shift = max(value.bit_length() - _SUB_BUCKET_BITS, 0)
+    return shift * _HALF + (value >> shift)
+
+
+def _bucket_value(index):
+    """Returns the midpoint of the values that fall into a bucket."""
+    shift = max(index // _HALF - 1, 0)
+    return ((index - shift * _HALF) << shift) + ((1 << shift) >> 1)
+
+
+class LatencyHistogram:
+    """Counts of durations in microseconds, in log-linear buckets. Not thread-safe on its own."""
+
+    def __init__(self):
+        self.counts = [0] * (_bucket_index(_MAX_VALUE) + 1)
+        self.total = 0
+        self.sum = 0
+        self.max = 0
+
+    def record(self, microseconds):
+        value = min(int(microseconds), _MAX_VALUE)
+        self.counts[_bucket_index(value)] += 1
+        self.total += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q):
+        """Returns the q-th percentile (0-100) in microseconds, or 0 if nothing was recorded."""
+        if not self.total:
+            return 0
+        rank = max(1, -(-self.total * q // 100))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(_bucket_value(index), self.max)
+        return self.max
+
+
+class _Stage:
+    """Times a `with` block into one of the instrumentation's histograms."""
+
+    __slots__ = ("owner", "name", "start")
+
+    def __init__(self, owner, name):
+        self.owner = owner
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.owner.record(self.name, time.perf_counter() - self.start)
+
+
+class _Query(_Stage):
+    """Times a whole query and runs the sampling profiler and periodic log around it."""
+
+    __slots__ = ("profiler", "number")
+
+    def __enter__(self):
+        owner, self.profiler = self.owner, None
+        self.number = next(owner._queries)
+        # Only one profiler can be active at a time (per process since Python 3.12),
+        # so a sample that would overlap another one is skipped.
+        if (owner.profile_every and self.number % owner.profile_every == 0
+                and owner._profile_lock.acquire(blocking=False)):
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiling tool is already active.
+                owner._profile_lock.release()
+            else:
+                self.profiler = profiler
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        owner = self.owner
+        owner.record(self.name, time.perf_counter() - self.start)
+        if self.profiler is not None:
+            self.profiler.disable()
+            owner._profile_lock.release()
+            owner._dump_profile(self.profiler, self.number)
+        owner.maybe_log()
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+# --- Instrumentation ---
+# One instance is shared by an engine and whatever drives it (the GUI, the
+# server), so all stages end up in the same stats() and log line. Set
+# log_interval to print a summary line at most that often, from whichever
+# query finishes after it has elapsed.
+class Instrumentation:
+    def __init__(self, enabled=True, log_interval=None, log=print, profile_every=0, profile_dir="profiles"):
+        self.enabled = enabled
+        self.log_interval = log_interval
+        self.log = log
+        self.profile_every = profile_every
+        self.profile_dir = profile_dir
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._profile_lock = threading.Lock()
+        self._queries = count(1)
+        self._last_log = time.monotonic()
+
+    def stage(self, name):
+        """Returns a context manager that records the duration of its block under name."""
+        return _Stage(self, name) if self.enabled else _NULL_STAGE
+
+    def query(self, name="query"):
+        """Like stage(), and also profiles every profile_every-th query and emits the periodic log line."""
+        return _Query(self, name) if self.enabled else _NULL_STAGE
+
+    def record(self, name, seconds):
+        """Records a duration in seconds."""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram()
+            histogram.record(seconds * 1e6)
+
+    def stats(self):
+        """Returns {stage: {"count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"}}."""
+        with self._lock:
+            return {
+                name: {
+                    "count": histogram.total,
+                    "mean_ms": histogram.sum / histogram.total / 1000,
+                    "p50_ms": histogram.percentile(50) / 1000,
+                    "p95_ms": histogram.percentile(95) / 1000,
+                    "p99_ms": histogram.percentile(99) / 1000,
+                    "max_ms": histogram.max / 1000,
+                }
+                for name, histogram in self._histograms.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+
+    def summary(self):
+        """Returns the stats as one line of text."""
+        parts = [f"{name} n={s['count']} p50={s['p50_ms']:.2f} p95={s['p95_ms']:.2f} p99={s['p99_ms']:.2f}"
+                 for name, s in self.stats().items()]
+        return "latency (ms): " + ("; ".join(parts) if parts else "no queries yet")
+
+    def maybe_log(self):
+        """Emits the summary line if log_interval seconds have passed since the last one."""
+        if not self.log_interval:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_log < self.log_interval:
+                return
+            self._last_log = now
+        self.log(self.summary())
+
+    def _dump_profile(self, profiler, number):
+        path = os.path.join(self.profile_dir, f"query-{os.getpid()}-{number}.prof")
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            profiler.dump_stats(path)
+        except OSError as e:
+            print(f"Error writing profile: {e}")
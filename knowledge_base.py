@@ -0,0 +1,89 @@
+# knowledge_base.py
+# Loads the FAQ knowledge base from a file or a directory of files and keeps a
+# live engine in sync with it.
+
+import os
+import threading
+
+from nlp_engine import load_faq_data
+
+
+def _source_files(path):
+    """Returns the FAQ files behind path: the file itself, or a directory's visible files in name order."""
+    if not os.path.isdir(path):
+        return [path]
+    return [os.path.join(path, name) for name in sorted(os.listdir(path))
+            if not name.startswith(".") and os.path.isfile(os.path.join(path, name))]
+
+
+def load_knowledge_base(path):
+    """Loads and concatenates the {"question", "answer"} entries of an FAQ file or directory.
+
+    Raises ValueError if a file is not a JSON list of such entries.
+    """
+    faq_data = []
+    for file_path in _source_files(path):
+        entries = load_faq_data(file_path)
+        if not isinstance(entries, list) or not all(
+                isinstance(item, dict) and "question" in item and "answer" in item for item in entries):
+            raise ValueError(f"{file_path} is not a list of question/answer entries")
+        faq_data.extend(entries)
+    return faq_data
+
+
+def source_signature(path):
+    """Returns a value that changes whenever a file under path is added, removed or modified."""
+    signature = []
+    for file_path in _source_files(path):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            continue
+        signature.append((file_path, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+# --- Knowledge Base Watcher ---
+# Polls the FAQ source every `interval` seconds and applies changes through
+# EnhancedNLPEngine.update_faqs. A file that fails to load (for example while
+# an editor is halfway through saving it) leaves the engine unchanged until
+# the next successful load. Callables in on_reload are called with the engine
+# after every applied change.
+class KnowledgeBaseWatcher:
+    def __init__(self, engine, path, interval=2.0, on_reload=None):
+        self.engine = engine
+        self.path = path
+        self.interval = interval
+        self.on_reload = list(on_reload or [])
+        self._signature = source_signature(path)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="knowledge-base-watcher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def check(self):
+        """Reloads the knowledge base if it changed; returns the update_faqs result or None."""
+        signature = source_signature(self.path)
+        if signature == self._signature:
+            return None
+        try:
+            result = self.engine.update_faqs(load_knowledge_base(self.path))
+        except (OSError, ValueError) as e:
+            print(f"Error reloading knowledge base: {e}")
+            return None
+        self._signature = signature
+        if result != "unchanged":
+            for callback in self.on_reload:
+                callback(self.engine)
+        return result
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
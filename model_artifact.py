@@ -0,0 +1,80 @@
+# model_artifact.py
+# Saves and loads a precompiled FAQ model so the engine can start without
+# re-running preprocessing and TF-IDF fitting.
+#
+# The artifact is an uncompressed .npz file: the CSR matrix, IDF weights and
+# a JSON blob with the vocabulary, stop words and answers. It records a hash
+# of the FAQ data and the tokenizer it was built with, and is ignored once
+# either differs from the engine loading it.
+# A file that cannot be read back is treated the same way as a stale one.
+
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+
+ARTIFACT_VERSION = 2
+
+ARRAY_NAMES = ("idf", "data", "indices", "indptr", "shape")
+META_KEYS = ("terms", "stop_words", "answers")
+
+
+def faq_hash(faq_data):
+    """Returns a stable SHA-256 hex digest of a list of FAQ entries."""
+    payload = json.dumps(faq_data, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def save_artifact(engine, path):
+    """Writes the trained state of an EnhancedNLPEngine to path.
+
+    The file is written next to path and renamed into place, so a crash while
+    saving never leaves a truncated artifact behind.
+    """
+    meta = {
+        "version": ARTIFACT_VERSION,
+        "faq_hash": faq_hash(engine.faq_data),
+        "tokenizer": engine.tokenizer,
+        "terms": engine.vectorizer.get_feature_names_out().tolist(),
+        "stop_words": sorted(engine.stop_words),
+        "answers": engine.answers,
+    }
+    vectors = engine.faq_vectors.tocsr()
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(
+                f,
+                meta=np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8),
+                idf=engine.vectorizer.idf_,
+                data=vectors.data,
+                indices=vectors.indices,
+                indptr=vectors.indptr,
+                shape=np.array(vectors.shape),
+            )
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def load_artifact(path, faq_data, tokenizer="punkt"):
+    """Returns the artifact contents as a dict, or None if it is missing, stale or unreadable."""
+    try:
+        with np.load(path, allow_pickle=False) as archive:
+            meta = json.loads(archive["meta"].tobytes().decode("utf-8"))
+            if meta.get("version") != ARTIFACT_VERSION or meta.get("faq_hash") != faq_hash(faq_data):
+                return None
+            # Vectors built from another tokenizer's tokens would not match this engine's queries.
+            if meta.get("tokenizer") != tokenizer:
+                return None
+            if any(key not in meta for key in META_KEYS):
+                return None
+            meta["arrays"] = {name: archive[name] for name in ARRAY_NAMES}
+    except (OSError, ValueError, EOFError, KeyError, zipfile.BadZipFile):
+        # json.JSONDecodeError and UnicodeDecodeError are both ValueErrors.
+        return None
+    return meta
@@ -0,0 +1,350 @@
+# nlp_engine.py
+# The FAQ engine: preprocessing, TF-IDF vectorization, retrieval and conversation context.
+
+import json
+import threading
+from functools import lru_cache
+from itertools import islice
+
+from answer_cache import AnswerCache
+from instrumentation import Instrumentation
+from model_artifact import load_artifact
+from retrieval import SCORERS
+from sessions import DEFAULT_SESSION, SessionStore
+from text_processing import TOKENIZERS, analyze_tokens, lemmatize_tokens, parallel_preprocess, preprocess_tokens
+
+# NLTK, scikit-learn and SciPy take a second or more each to import, so they
+# are imported where an engine first needs them rather than here. Importing
+# this module stays cheap, and a GUI can show its window while the engine is
+# built on another thread.
+
+# Minimum cosine similarity for an FAQ answer to be returned instead of the fallback.
+SIMILARITY_THRESHOLD = 0.15
+
+# Number of previous questions that contribute to a query as conversation context.
+CONTEXT_TURNS = 2
+
+# Weight of each earlier turn relative to the one after it: the previous
+# question counts CONTEXT_DECAY times the new one, the one before that
+# CONTEXT_DECAY ** 2 times, and so on. 0 ignores the context entirely.
+CONTEXT_DECAY = 0.5
+
+# Fraction of FAQ rows that may be added or removed incrementally (scored
+# against the IDF weights of the last full fit) before update_faqs refits.
+REFIT_THRESHOLD = 0.2
+
+# Minimum Jaccard similarity between the terms of two questions for one to be
+# answered from the other's cache entry. 1.0 only reuses exact matches.
+NEAR_DUPLICATE_THRESHOLD = 0.8
+
+
+def check_nltk_data():
+    """Raises LookupError if one of the required NLTK datasets is missing."""
+    import nltk
+    nltk.data.find('tokenizers/punkt')
+    nltk.data.find('corpora/stopwords')
+    nltk.data.find('corpora/wordnet.zip/wordnet/index.sense')
+
+
+def load_faq_data(path):
+    """Loads a list of {"question", "answer"} entries from a JSON file."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# --- FAQ Index ---
+# Everything a query reads from the knowledge base. The engine swaps in a new
+# FAQIndex as a whole, so a query that took a reference to the old one keeps
+# a consistent view while the next one is being built.
+class FAQIndex:
+    def __init__(self, faq_data, vectorizer, faq_vectors, scorer, answers=None, fitted_rows=None, changed_rows=0):
+        self.faq_data = faq_data
+        self.questions = [item["question"] for item in faq_data]
+        self.answers = answers if answers is not None else [item["answer"] for item in faq_data]
+        self.vectorizer = vectorizer
+        self.faq_vectors = faq_vectors
+        self.scorer = scorer
+        # Rows at the last full fit, and rows added or removed incrementally since.
+        self.fitted_rows = faq_vectors.shape[0] if fitted_rows is None else fitted_rows
+        self.changed_rows = changed_rows
+
+
+# --- Enhanced NLP Engine ---
+# This class handles all the natural language processing tasks.
+# It has no GUI dependencies, so it can also be used from headless scripts.
+class EnhancedNLPEngine:
+    def __init__(self, faq_data, backend="tfidf", artifact_path=None, tokenizer="punkt", lemma_cache_size=100000,
+                 sessions=None, context_decay=CONTEXT_DECAY, pool=None, refit_threshold=REFIT_THRESHOLD,
+                 answer_cache_size=10000, near_duplicate_threshold=NEAR_DUPLICATE_THRESHOLD, instrumentation=None):
+        if backend not in SCORERS:
+            raise ValueError(f"Unknown retrieval backend {backend!r}; expected one of {sorted(SCORERS)}")
+        if tokenizer not in TOKENIZERS:
+            raise ValueError(f"Unknown tokenizer {tokenizer!r}; expected one of {sorted(TOKENIZERS)}")
+        from nltk.stem import WordNetLemmatizer
+        self.backend = backend
+        self.tokenizer = tokenizer
+        self._tokenize = TOKENIZERS[tokenizer]
+        # WordNet itself is only read on the first lemmatize() call.
+        self.lemmatizer = WordNetLemmatizer()
+        # The same words recur in every query and in the history context, so lemmas are memoized per token.
+        self._lemmatize = lru_cache(maxsize=lemma_cache_size)(self.lemmatizer.lemmatize)
+        # Optional multiprocessing pool used to preprocess the FAQ questions in parallel.
+        self.pool = pool
+        # Each session remembers its last CONTEXT_TURNS questions for context.
+        self.sessions = sessions if sessions is not None else SessionStore(max_turns=CONTEXT_TURNS)
+        self.context_decay = context_decay
+        self.refit_threshold = refit_threshold
+        # Repeated questions are answered without vectorizing or scoring them; 0 disables the cache.
+        self.answer_cache = AnswerCache(answer_cache_size, threshold=near_duplicate_threshold)
+        # Per-stage latency histograms of the conversational query path (see instrumentation.py).
+        self.instrumentation = instrumentation if instrumentation is not None else Instrumentation()
+        self._update_lock = threading.Lock()
+        artifact = load_artifact(artifact_path, faq_data, tokenizer) if artifact_path else None
+        self.from_artifact = artifact is not None
+        if artifact is not None:
+            self.index = self._load(faq_data, artifact)
+        else:
+            from nltk.corpus import stopwords
+            self.stop_words = set(stopwords.words('english'))
+            self.index = self._train(faq_data)
+
+    # The current index's attributes, for callers that only read them.
+    faq_data = property(lambda self: self.index.faq_data)
+    questions = property(lambda self: self.index.questions)
+    answers = property(lambda self: self.index.answers)
+    vectorizer = property(lambda self: self.index.vectorizer)
+    faq_vectors = property(lambda self: self.index.faq_vectors)
+    scorer = property(lambda self: self.index.scorer)
+
+    def _train(self, faq_data):
+        """Pre-processes the FAQ data, trains the TF-IDF vectorizer and returns a new index."""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        questions = [item["question"] for item in faq_data]
+        if self.pool is not None:
+            processed_faqs = parallel_preprocess(self.pool, questions, self.stop_words, self.tokenizer)
+        else:
+            processed_faqs = [self._preprocess_tokens(q) for q in questions]
+        vectorizer = TfidfVectorizer(analyzer=analyze_tokens)
+        faq_vectors = vectorizer.fit_transform(processed_faqs)
+        return FAQIndex(faq_data, vectorizer, faq_vectors, self._scorer(vectorizer, faq_vectors))
+
+    def _scorer(self, vectorizer, faq_vectors):
+        """Builds the selected backend's scorer over the FAQ vectors."""
+        return SCORERS[self.backend](faq_vectors, vectorizer.get_feature_names_out())
+
+    def _load(self, faq_data, artifact):
+        """Restores the vectorizer and FAQ vectors from a precompiled artifact."""
+        from scipy.sparse import csr_matrix
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        arrays = artifact["arrays"]
+        self.stop_words = set(artifact["stop_words"])
+        vectorizer = TfidfVectorizer(
+            analyzer=analyze_tokens, vocabulary={term: i for i, term in enumerate(artifact["terms"])})
+        vectorizer.idf_ = arrays["idf"]
+        faq_vectors = csr_matrix(
+            (arrays["data"], arrays["indices"], arrays["indptr"]), shape=tuple(arrays["shape"]))
+        return FAQIndex(faq_data, vectorizer, faq_vectors, self._scorer(vectorizer, faq_vectors),
+                        answers=artifact["answers"])
+
+    def update_faqs(self, faq_data):
+        """Applies added, edited and deleted FAQ entries to the live engine.
+
+        Entries are matched by question. Rows whose question is unchanged keep
+        their vectors and new questions are vectorized against the current
+        IDF weights, unless they contain terms outside the vocabulary or more
+        than refit_threshold of the rows changed since the last full fit; then
+        everything is refitted. The new index replaces the old one in a single
+        assignment and the answer cache is cleared. Returns "unchanged", "incremental" or "refit".
+        """
+        with self._update_lock:
+            old = self.index
+            if faq_data == old.faq_data:
+                return "unchanged"
+            old_rows = {q: i for i, q in enumerate(old.questions)}
+            questions = [item["question"] for item in faq_data]
+            added = [q for q in dict.fromkeys(questions) if q not in old_rows]
+            removed = len(old_rows.keys() - set(questions))
+            changed_rows = old.changed_rows + len(added) + removed
+            added_tokens = [self._preprocess_tokens(q) for q in added]
+            vocabulary = old.vectorizer.vocabulary_
+            drifted = any(t not in vocabulary for tokens in added_tokens for t in analyze_tokens(tokens))
+            if not questions or drifted or changed_rows > self.refit_threshold * max(old.fitted_rows, 1):
+                self.index = self._train(faq_data)
+                self.answer_cache.clear()
+                return "refit"
+
+            from scipy.sparse import vstack
+            stacked = old.faq_vectors
+            if added:
+                stacked = vstack([stacked, old.vectorizer.transform(added_tokens)], format="csr")
+            added_rows = {q: old.faq_vectors.shape[0] + i for i, q in enumerate(added)}
+            faq_vectors = stacked[[old_rows[q] if q in old_rows else added_rows[q] for q in questions]]
+            scorer = self._scorer(old.vectorizer, faq_vectors)
+            self.index = FAQIndex(faq_data, old.vectorizer, faq_vectors, scorer,
+                                  fitted_rows=old.fitted_rows, changed_rows=changed_rows)
+            # Only once the new index is in place, so no answer from the old one is cached again.
+            self.answer_cache.clear()
+            return "incremental"
+
+    def _preprocess_tokens(self, text):
+        """Tokenizes, lemmatizes, and removes stop words from text, returning a token list."""
+        return preprocess_tokens(text, self._tokenize, self.stop_words, self._lemmatize)
+
+    def _preprocess_text(self, text):
+        """Tokenizes, lemmatizes, and removes stop words from text."""
+        return " ".join(self._preprocess_tokens(text))
+
+    def lemma_cache_info(self):
+        """Returns the hits, misses, maxsize and currsize of the lemma cache."""
+        return self._lemmatize.cache_info()
+
+    def answer_cache_info(self):
+        """Returns the hit counters, hit rate and size of the answer cache."""
+        return self.answer_cache.info()
+
+    def latency_stats(self):
+        """Returns the p50/p95/p99 latency of each query stage, in milliseconds."""
+        return self.instrumentation.stats()
+
+    def get_most_similar_answer(self, user_question, session_id=DEFAULT_SESSION):
+        """Finds the most relevant answer from the FAQ data."""
+        return self.get_most_similar_answers([user_question], [session_id])[0]
+
+    def get_most_similar_answers(self, user_questions, session_ids):
+        """Answers several questions, each in its own session, with one scorer call.
+
+        This is the conversational counterpart of get_top_answers_batch, used
+        to micro-batch concurrent requests. Every question sees its session's
+        context as it was before the batch.
+
+        Answers are looked up in the answer cache by the question's terms and
+        those of its context turns first. The remaining questions are
+        vectorized together, and each query is the question's TF-IDF vector
+        plus the decayed vectors of the previous turns, which are kept in the
+        session so that only new questions need vectorizing.
+
+        Each stage is timed once per call, so a micro-batch counts as one query.
+        """
+        stats = self.instrumentation
+        with stats.query():
+            cache = self.answer_cache
+            # Read before the index, so an answer from an index replaced meanwhile is not cached.
+            generation = cache.generation
+            index = self.index
+            with stats.stage("tokenize"):
+                tokens = [self._tokenize(q.lower()) for q in user_questions]
+            with stats.stage("lemmatize"):
+                terms = [lemmatize_tokens(t, self.stop_words, self._lemmatize) for t in tokens]
+            with stats.stage("cache"):
+                contexts = [self._context_turns(session_id, index) for session_id in session_ids]
+                answers = [cache.get(terms[i], [turn_terms for _, turn_terms in contexts[i]])
+                           for i in range(len(user_questions))]
+            question_vectors = [None] * len(user_questions)
+            misses = [i for i, answer in enumerate(answers) if answer is None]
+            if misses:
+                with stats.stage("transform"):
+                    miss_vectors, query_vectors = self._query_vectors(
+                        [terms[i] for i in misses], [contexts[i] for i in misses], index)
+                with stats.stage("score"):
+                    results = index.scorer.search_batch(query_vectors, top_k=1,
+                                                        query_terms=[terms[i] for i in misses])
+                for i, question_vector, matches in zip(misses, miss_vectors, results):
+                    question_vectors[i] = question_vector
+                    answers[i] = self._best_answer(matches, index)
+                    cache.put(terms[i], [turn_terms for _, turn_terms in contexts[i]], answers[i], generation)
+            for i, session_id in enumerate(session_ids):
+                self.sessions.add_turn(session_id, user_questions[i], question_vectors[i], terms[i], index.vectorizer)
+            return answers
+
+    def _best_answer(self, matches, index):
+        """Returns the answer of the best match, or the fallback if it is not similar enough."""
+        if matches and matches[0][1] > SIMILARITY_THRESHOLD:
+            return index.answers[matches[0][0]]
+        else:
+            return self.get_fallback_response()
+
+    def _context_turns(self, session_id, index):
+        """Returns the (vector, terms) of the turns that count as a session's context, most recent first.
+
+        A turn vectorized by another vectorizer than the index's, i.e. before a
+        full refit, has its vector replaced by None: its columns may mean other
+        terms now, even if the vocabulary still has the same size.
+        """
+        if not self.context_decay:
+            return []
+        return [(vector if vectorizer is index.vectorizer else None, terms) for _, vector, terms, vectorizer
+                in reversed(self.sessions.recent_turns(session_id)[-CONTEXT_TURNS:])]
+
+    def _query_vectors(self, questions_terms, contexts, index):
+        """Returns the question vectors and the matrix of context-weighted query vectors.
+
+        Turns answered from the cache or asked before a full refit have no
+        usable vector; they are vectorized again from their terms, in the same
+        transform call as the questions.
+        """
+        from scipy.sparse import vstack
+        rows = list(questions_terms)
+        context_rows = []
+        for context in contexts:
+            turn_rows = []
+            for vector, turn_terms in context:
+                if vector is None:
+                    turn_rows.append(len(rows))
+                    rows.append(turn_terms)
+                else:
+                    turn_rows.append(None)
+            context_rows.append(turn_rows)
+        vectors = index.vectorizer.transform(rows)
+        question_vectors = [vectors[i] for i in range(len(questions_terms))]
+        query_vectors = vstack([
+            self._with_context(question_vectors[i], [vector if row is None else vectors[row]
+                                                     for (vector, _), row in zip(context, context_rows[i])])
+            for i, context in enumerate(contexts)], format="csr")
+        return question_vectors, query_vectors
+
+    def _with_context(self, question_vector, context_vectors):
+        """Returns the L2-normalised sum of the question and its decayed context vectors."""
+        from sklearn.preprocessing import normalize
+        if not context_vectors:
+            return question_vector
+        combined, weight = question_vector, 1.0
+        for turn_vector in context_vectors:
+            weight *= self.context_decay
+            combined = combined + weight * turn_vector
+        # The scorers rely on unit-length rows, as produced by the vectorizer.
+        return normalize(combined)
+
+    def get_top_answers_batch(self, questions, top_k=1, chunk_size=1024):
+        """Yields the top-k (answer, score) pairs for each question in an iterable.
+
+        Questions are answered independently of the conversation history. Each
+        chunk is transformed into one sparse matrix and handed to the scorer,
+        which for the default backend is a single sparse matrix product.
+        """
+        top_k = max(1, min(top_k, len(self.answers)))
+        questions = iter(questions)
+        while True:
+            chunk = list(islice(questions, chunk_size))
+            if not chunk:
+                return
+            for row in self._score_chunk(chunk, top_k, self.index):
+                yield row
+
+    def _score_chunk(self, chunk, top_k, index):
+        """Scores a list of questions and returns their top-k (answer, score) pairs."""
+        processed = [self._preprocess_tokens(q) for q in chunk]
+        query_vectors = index.vectorizer.transform(processed)
+        return [[(index.answers[i], score) for i, score in matches]
+                for matches in index.scorer.search_batch(query_vectors, top_k, query_terms=processed)]
+
+    def get_fallback_response(self):
+        """Provides a default response when no good answer is found."""
+        return "I'm sorry, I don't have a specific answer for that. Could you please try rephrasing your question?"
+
+    def last_question(self, session_id=DEFAULT_SESSION):
+        """Returns the most recent question asked in a session, or None."""
+        return self.sessions.last_question(session_id)
+
+    def clear_history(self, session_id=DEFAULT_SESSION):
+        """Clears the conversation history of a session."""
+        self.sessions.clear(session_id)
@@ -0,0 +1,303 @@
+# retrieval.py
+# Retrieval backends that rank FAQ rows against TF-IDF query vectors.
+
+import heapq
+from collections import Counter
+from operator import itemgetter
+
+import numpy as np
+
+from ann import QuantizedIVFIndex
+
+
+# Every scorer is built as Scorer(doc_vectors, terms), where doc_vectors are
+# the FAQ questions' TF-IDF rows and terms the vectorizer's feature names.
+# It is searched with the TF-IDF rows of the questions asked and, optionally,
+# their lemmas (query_terms), which only scorers that can use words outside
+# the vocabulary look at. SciPy and scikit-learn are imported on first use,
+# like in nlp_engine.py, so that SCORERS can be read cheaply.
+
+
+# --- Brute-Force Scorer ---
+# Scores every FAQ row against the query. This is the original retrieval path.
+class BruteForceScorer:
+    def __init__(self, doc_vectors, terms=None):
+        self.doc_vectors = doc_vectors
+
+    def search(self, query_vector, top_k=1, query_terms=None):
+        """Returns up to top_k (index, score) pairs for a single query row, best first."""
+        return self.search_batch(query_vector, top_k)[0]
+
+    def search_batch(self, query_vectors, top_k=1, query_terms=None):
+        """Scores many query rows with one sparse matrix product.
+
+        Only FAQs with a non-zero score are returned, ties going to the lower index.
+        """
+        # TF-IDF rows are L2-normalised, so the dot product is the cosine similarity.
+        scores = (query_vectors @ self.doc_vectors.T).tocsr()
+        return [self._top_k(scores.indices[start:end], scores.data[start:end], top_k)
+                for start, end in zip(scores.indptr[:-1], scores.indptr[1:])]
+
+    def _top_k(self, indices, similarities, top_k):
+        """Selects the top_k entries of one sparse score row."""
+        positive = similarities > 0
+        indices, similarities = indices[positive], similarities[positive]
+        if top_k < similarities.shape[0]:
+            # Keep everything tied with the k-th score so the tie-break below sees it.
+            threshold = np.partition(similarities, -top_k)[-top_k]
+            keep = similarities >= threshold
+            indices, similarities = indices[keep], similarities[keep]
+        ranked = np.lexsort((indices, -similarities))[:top_k]
+        return [(int(indices[i]), float(similarities[i])) for i in ranked]
+
+
+# --- Inverted Index Scorer ---
+# Keeps a postings list per term so that only FAQs sharing a term with the
+# query are scored. Terms are processed in order of decreasing upper bound
+# (max-score); once the remaining terms cannot lift a new document into the
+# top-k, they are only used to complete the scores of existing candidates.
+class InvertedIndexScorer:
+    def __init__(self, doc_vectors, terms=None, early_termination=True):
+        postings = doc_vectors.tocsc()
+        postings.sort_indices()
+        self.num_docs = doc_vectors.shape[0]
+        self.indptr = postings.indptr
+        self.doc_ids = postings.indices
+        self.weights = postings.data
+        self.max_weights = postings.max(axis=0).toarray().ravel()
+        self.early_termination = early_termination
+
+    def _postings(self, term):
+        """Returns the (doc ids, weights) postings for a term, sorted by doc id."""
+        start, end = self.indptr[term], self.indptr[term + 1]
+        return self.doc_ids[start:end], self.weights[start:end]
+
+    def search(self, query_vector, top_k=1, query_terms=None):
+        """Returns up to top_k (index, score) pairs for a single query row, best first.
+
+        Only documents that share at least one term with the query are
+        returned, so the result is empty when nothing matches.
+        """
+        terms, query_weights = query_vector.indices, query_vector.data
+        if terms.size == 0:
+            return []
+        bounds = query_weights * self.max_weights[terms]
+        order = np.argsort(-bounds, kind="stable")
+        # remaining[i] is the best score any document can still gain after the i-th term.
+        remaining = np.append(np.cumsum(bounds[order][::-1])[::-1][1:], 0.0)
+
+        cand_docs = np.empty(0, dtype=self.doc_ids.dtype)
+        cand_scores = np.empty(0)
+        essential = True
+        for step, position in enumerate(order):
+            docs, weights = self._postings(terms[position])
+            contribution = query_weights[position] * weights
+            if essential:
+                cand_docs, inverse = np.unique(np.concatenate([cand_docs, docs]), return_inverse=True)
+                cand_scores = np.bincount(inverse, weights=np.concatenate([cand_scores, contribution]))
+                if self.early_termination and cand_scores.size >= top_k:
+                    threshold = np.partition(cand_scores, -top_k)[-top_k]
+                    if remaining[step] < threshold:
+                        # No unseen document can reach the top-k any more.
+                        essential = False
+                        keep = cand_scores + remaining[step] >= threshold
+                        cand_docs, cand_scores = cand_docs[keep], cand_scores[keep]
+            elif docs.size:
+                found = np.minimum(np.searchsorted(docs, cand_docs), docs.size - 1)
+                hit = docs[found] == cand_docs
+                cand_scores[hit] += contribution[found[hit]]
+
+        # nlargest is stable, and candidates are sorted by doc id, so ties go
+        # to the lower index exactly like argmax does.
+        best = heapq.nlargest(top_k, zip(cand_scores.tolist(), cand_docs.tolist()), key=itemgetter(0))
+        return [(doc, score) for score, doc in best]
+
+    def search_batch(self, query_vectors, top_k=1, query_terms=None):
+        """Searches each query row in turn."""
+        return [self.search(query_vectors[i], top_k) for i in range(query_vectors.shape[0])]
+
+
+# --- Dense Hybrid Scorer ---
+def _char_ngrams(word, sizes=(3, 4)):
+    """Yields the character n-grams of a word padded with spaces, like scikit-learn's char_wb analyzer."""
+    padded = f" {word} "
+    for n in sizes:
+        for start in range(max(len(padded) - n, 0) + 1):
+            yield padded[start:start + n]
+
+
+# Embeds FAQs with LSA: each TF-IDF row is extended with the character
+# n-grams of its terms and projected onto the top components of a truncated
+# SVD of those rows. Words outside the vocabulary are embedded from their
+# character n-grams alone. This lets questions match FAQs they share no lemma
+# with, through related forms ("returning", "return") or words that co-occur
+# across the FAQ set. The FAQ embeddings are searched with a quantized IVF
+# index (ann.py), and those candidates plus the best lexical ones are ranked
+# by a blend of embedding similarity and BM25. The context turns blended into
+# a query row only shape the embedding; BM25 scores the question's own terms.
+#
+# Projected vectors are compared by cosine, scaled down when the question
+# keeps less of its norm through the projection than the median FAQ does, so
+# a question the components say little about (gibberish, an unknown name)
+# scores low rather than being stretched to unit length.
+class DenseScorer:
+    def __init__(self, doc_vectors, terms=None, dimensions=128, char_weight=0.5, dense_weight=0.5,
+                 candidates=100, postings_depth=1000, fit_sample=20000, k1=1.2, b=0.75, seed=0):
+        from scipy.sparse import csr_matrix, hstack, identity
+        from sklearn.decomposition import TruncatedSVD
+        from sklearn.preprocessing import normalize
+        doc_vectors = doc_vectors.tocsr()
+        num_docs, num_terms = doc_vectors.shape
+        self.char_weight = char_weight if terms is not None else 0.0
+        self.dense_weight = dense_weight
+        self.candidates = candidates
+        self.postings_depth = postings_depth
+        self.k1, self.b = k1, b
+
+        # Unit-length character n-gram counts of each term, scaled by char_weight.
+        self.vocabulary = {term: i for i, term in enumerate(terms)} if terms is not None else {}
+        self.ngram_ids = {}
+        rows, columns, counts = [], [], []
+        if self.char_weight:
+            for i, term in enumerate(terms):
+                for gram, count in Counter(_char_ngrams(term)).items():
+                    rows.append(i)
+                    columns.append(self.ngram_ids.setdefault(gram, len(self.ngram_ids)))
+                    counts.append(count)
+        ngrams = csr_matrix((np.array(counts, dtype=np.float32), (rows, columns)),
+                            shape=(num_terms, len(self.ngram_ids)))
+        ngrams = self.char_weight * normalize(ngrams)
+        ngrams.sort_indices()
+        self.ngram_indptr, self.ngram_columns, self.ngram_values = ngrams.indptr, ngrams.indices, ngrams.data
+
+        expanded = doc_vectors @ hstack([identity(num_terms, dtype=np.float32, format="csr"), ngrams], format="csr")
+        # Fitted on a sample of the FAQs, which bounds the build time.
+        rng = np.random.default_rng(seed)
+        sample = expanded if num_docs <= fit_sample else expanded[rng.choice(num_docs, fit_sample, replace=False)]
+        dimensions = max(1, min(dimensions, sample.shape[0], sample.shape[1] - 1))
+        projection = TruncatedSVD(n_components=dimensions, random_state=seed).fit(sample).components_.T
+        projection = projection.astype(np.float32)
+        self.term_vectors = np.asarray(projection[:num_terms] + ngrams @ projection[num_terms:], dtype=np.float32)
+        # Only needed for words outside the vocabulary, so kept at half precision.
+        self.ngram_vectors = projection[num_terms:].astype(np.float16)
+
+        embeddings = np.asarray(doc_vectors.astype(np.float32) @ self.term_vectors)
+        lengths = np.linalg.norm(embeddings, axis=1)
+        norms = np.sqrt(np.asarray(expanded.multiply(expanded).sum(axis=1)).ravel())
+        retained = np.divide(lengths, norms, out=np.zeros_like(lengths), where=norms > 0)
+        self.reference = float(np.median(retained)) if num_docs else 0.0
+        self.reference = self.reference or 1.0
+        self.index = QuantizedIVFIndex(normalize(embeddings), seed=seed)
+
+        # BM25 weights of each (FAQ, term) pair. Questions rarely repeat a
+        # lemma, so term frequencies are taken as 1 and lengths count terms.
+        lengths = np.diff(doc_vectors.indptr)
+        self.avg_length = max(lengths.mean(), 1.0) if num_docs else 1.0
+        doc_freq = np.bincount(doc_vectors.indices, minlength=num_terms)
+        self.idf = np.log(1 + (num_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+        self.doc_weights = doc_vectors.copy()
+        self.doc_weights.data = self.idf[doc_vectors.indices] * self._saturation(np.repeat(lengths, lengths))
+        # Postings are kept in impact order, highest weight first, so
+        # candidates can be taken from the head of each list.
+        postings = self.doc_weights.tocsc()
+        order = np.lexsort((-postings.data, np.repeat(np.arange(num_terms), np.diff(postings.indptr))))
+        self.indptr, self.doc_ids, self.weights = postings.indptr, postings.indices[order], postings.data[order]
+
+    def _saturation(self, lengths):
+        """BM25's (k1 + 1) / (tf + k1 * (1 - b + b * length / avg_length)) for tf = 1."""
+        return (self.k1 + 1) / (1 + self.k1 * (1 - self.b + self.b * lengths / self.avg_length))
+
+    def _embed(self, terms, weights, words):
+        """Returns the unit-length embedding of a query row and the fraction of its norm the projection keeps.
+
+        words are the question's lemmas; those outside the vocabulary are
+        added through their character n-grams.
+        """
+        embedding = weights.astype(np.float32) @ self.term_vectors[terms]
+        spans = [slice(self.ngram_indptr[t], self.ngram_indptr[t + 1]) for t in terms]
+        columns = [self.ngram_columns[span] for span in spans]
+        values = [w * self.ngram_values[span] for w, span in zip(weights, spans)]
+        unseen = 0.0
+        unknown = [w for w in words if len(w) > 1 and w not in self.vocabulary] if self.char_weight and words else []
+        # An unknown word weighs as much as an average known one.
+        weight = self.char_weight * (weights.mean() if weights.size else 1.0)
+        for word in unknown:
+            grams = Counter(_char_ngrams(word))
+            scale = weight / np.sqrt(sum(c * c for c in grams.values()))
+            known = [(self.ngram_ids[g], c * scale) for g, c in grams.items() if g in self.ngram_ids]
+            # N-grams seen in no term still count towards the norm.
+            unseen += sum((c * scale) ** 2 for g, c in grams.items() if g not in self.ngram_ids)
+            if known:
+                word_columns, word_values = (np.array(x) for x in zip(*known))
+                embedding = embedding + word_values.astype(np.float32) @ self.ngram_vectors[word_columns]
+                columns.append(word_columns)
+                values.append(word_values)
+        squared_norm = float(weights @ weights) + unseen
+        if columns:
+            _, inverse = np.unique(np.concatenate(columns), return_inverse=True)
+            squared_norm += np.square(np.bincount(inverse, weights=np.concatenate(values))).sum()
+        length = float(np.linalg.norm(embedding))
+        if not length:
+            return embedding, 0.0
+        return embedding / length, length / np.sqrt(squared_norm)
+
+    def _lexical_candidates(self, terms):
+        """Returns the FAQ rows with the best BM25 scores over the first postings_depth postings of each term."""
+        spans = [(self.indptr[t], min(self.indptr[t + 1], self.indptr[t] + self.postings_depth)) for t in terms]
+        docs = np.concatenate([self.doc_ids[s:e] for s, e in spans])
+        if docs.size > self.candidates:
+            partial = np.bincount(docs, weights=np.concatenate([self.weights[s:e] for s, e in spans]))
+            docs = docs[np.argpartition(-partial[docs], self.candidates - 1)[:self.candidates]]
+        return docs
+
+    def _search(self, terms, weights, words, top_k):
+        embedding, retained = self._embed(terms, weights, words)
+        ids = self.index.search(embedding, self.candidates)[0] if retained else np.empty(0, dtype=np.intp)
+        # Every term of the row would count fully in BM25, so the decayed context is left out of it.
+        if words is not None and self.vocabulary:
+            terms = np.unique(np.array([self.vocabulary[w] for w in words if w in self.vocabulary], dtype=np.intp))
+        lexical = 0.0
+        if terms.size:
+            ids = np.union1d(ids, self._lexical_candidates(terms))
+            indicator = np.zeros(self.idf.size)
+            indicator[terms] = 1.0
+            own = (self.idf[terms] * self._saturation(terms.size)).sum()
+            # Scaled so that an FAQ identical to the question scores 1, like a cosine similarity.
+            lexical = np.minimum((self.doc_weights[ids] @ indicator) / own, 1.0)
+        else:
+            ids = np.sort(ids)
+        if not ids.size:
+            return []
+        # Clipped because int8 rounding can push a perfect match just above 1.
+        dense = np.minimum(self.index.scores_for_rows(embedding, ids), 1.0) * min(1.0, retained / self.reference)
+        scores = self.dense_weight * dense + (1 - self.dense_weight) * lexical
+        # Only positive scores are returned, as with the other scorers.
+        positive = scores > 0
+        ids, scores = ids[positive], scores[positive]
+        # ids are sorted, so ties go to the lower index as with the other scorers.
+        best = np.argsort(-scores, kind="stable")[:top_k]
+        return [(int(ids[i]), float(scores[i])) for i in best]
+
+    def search(self, query_vector, top_k=1, query_terms=None):
+        """Returns up to top_k (index, score) pairs for a single query row, best first.
+
+        The result is empty when the question has no known term and no
+        character n-gram in common with the vocabulary.
+        """
+        return self.search_batch(query_vector, top_k, None if query_terms is None else [query_terms])[0]
+
+    def search_batch(self, query_vectors, top_k=1, query_terms=None):
+        """Searches each query row in turn."""
+        query_vectors = query_vectors.tocsr()
+        indptr, indices, data = query_vectors.indptr, query_vectors.indices, query_vectors.data
+        return [self._search(indices[indptr[i]:indptr[i + 1]], data[indptr[i]:indptr[i + 1]],
+                             None if query_terms is None else query_terms[i], top_k)
+                for i in range(query_vectors.shape[0])]
+
+
+# Retrieval backends selectable through EnhancedNLPEngine(backend=...).
+SCORERS = {
+    "tfidf": BruteForceScorer,
+    "inverted": InvertedIndexScorer,
+    "dense": DenseScorer,
+}
@@ -0,0 +1,407 @@
+# server.py
+# Serves the FAQ engine over HTTP and WebSocket with asyncio (standard library only).
+#
+# Usage:
+#   python server.py --faq FAQ --port 8000
+#
+# Endpoints:
+#   POST /query     {"question": "...", "session_id": "..."}
+#                   -> {"answer": "...", "session_id": "...", "answer_id": "..."}
+#   POST /feedback  {"answer_id": "...", "feedback": "positive" | "negative"}  -> {"ok": true}
+#                   (without answer_id, the feedback is for the session's last question)
+#   GET  /health    -> {"ok": true, "pending": <queued questions>, "answer_cache": <hit counters>}
+#   GET  /stats     -> {"latency": {<stage>: {"count", "p50_ms", "p95_ms", "p99_ms", ...}}}
+#   GET  /ws        WebSocket; each text message is a question (plain or {"question": ...}),
+#                   each reply is {"answer": ...}. One session per connection.
+#
+# Questions arriving within --batch-window-ms of each other are answered with
+# one call to EnhancedNLPEngine.get_most_similar_answers, on a bounded thread
+# pool so the event loop never runs scoring code. Once --max-pending questions
+# are queued, new ones are rejected with 503 instead of piling up.
+#
+# Stage latencies are printed every --stats-interval seconds, and with
+# --profile-every N every Nth engine call is profiled into --profile-dir.
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+import sys
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from feedback import FeedbackWriter
+from instrumentation import Instrumentation
+from knowledge_base import KnowledgeBaseWatcher, load_knowledge_base
+from nlp_engine import EnhancedNLPEngine, check_nltk_data
+from retrieval import SCORERS
+
+MAX_BODY_BYTES = 64 * 1024
+# Answers that feedback can still refer to by answer_id.
+MAX_ANSWER_IDS = 10000
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+Request = namedtuple("Request", "method path query headers body")
+
+STATUS_TEXT = {
+    200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 431: "Request Header Fields Too Large", 503: "Service Unavailable",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Overloaded(Exception):
+    """Raised when too many questions are already waiting to be answered."""
+
+
+# --- Micro-Batcher ---
+# Collects questions for a few milliseconds (or until max_batch of them have
+# arrived) and answers them together on the executor.
+class MicroBatcher:
+    def __init__(self, engine, executor, window=0.005, max_batch=256, max_pending=1024):
+        self.engine = engine
+        self.executor = executor
+        self.window = window
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.pending = 0
+        self._queue = []
+        self._flush_handle = None
+
+    async def answer(self, question, session_id):
+        """Returns the engine's answer to one question, batched with its neighbours."""
+        if self.pending >= self.max_pending:
+            raise Overloaded()
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((question, session_id, future))
+        self.pending += 1
+        if len(self._queue) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+        try:
+            return await future
+        finally:
+            self.pending -= 1
+            # Queueing, batching and scoring, as seen by the client.
+            self.engine.instrumentation.record("request", time.perf_counter() - started)
+
+    def _flush(self):
+        """Hands the queued questions to the executor as one batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._queue = self._queue, []
+        if not batch:
+            return
+        questions = [question for question, _, _ in batch]
+        session_ids = [session_id for _, session_id, _ in batch]
+        futures = [future for _, _, future in batch]
+        task = asyncio.get_running_loop().run_in_executor(
+            self.executor, self.engine.get_most_similar_answers, questions, session_ids)
+        task.add_done_callback(lambda done: self._resolve(done, futures))
+
+    @staticmethod
+    def _resolve(done, futures):
+        """Passes the batch's answers (or its exception) on to the waiting requests."""
+        error = done.exception()
+        answers = None if error else done.result()
+        for i, future in enumerate(futures):
+            if future.done():
+                continue
+            if error:
+                future.set_exception(error)
+            else:
+                future.set_result(answers[i])
+
+
+# --- Chat Server ---
+class ChatServer:
+    def __init__(self, engine, batcher, feedback_writer):
+        self.engine = engine
+        self.batcher = batcher
+        self.feedback_writer = feedback_writer
+        # answer_id -> the question it answered, oldest first. Only touched on the event loop.
+        self.answered = OrderedDict()
+
+    async def handle_connection(self, reader, writer):
+        """Serves HTTP requests on one keep-alive connection, or upgrades it to a WebSocket."""
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:
+                    await self._send_json(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    return
+                if request is None:
+                    return
+                if request.path == "/ws" and request.headers.get("upgrade", "").lower() == "websocket":
+                    await self._serve_websocket(request, reader, writer)
+                    return
+                keep_alive = request.headers.get("connection", "").lower() != "close"
+                try:
+                    status, payload = await self._dispatch(request)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                await self._send_json(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        """Reads one HTTP/1.1 request, or returns None when the client closed the connection."""
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError:
+            raise HTTPError(431, "Request headers too large")
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        url = urlsplit(target)
+        return Request(method.upper(), url.path, parse_qs(url.query), headers, body)
+
+    async def _dispatch(self, request):
+        """Routes a plain HTTP request and returns (status, JSON payload)."""
+        if request.method == "OPTIONS":
+            return 204, None
+        if request.path == "/health":
+            return 200, {"ok": True, "pending": self.batcher.pending,
+                         "answer_cache": self.engine.answer_cache_info()}
+        if request.path == "/stats":
+            return 200, {"latency": self.engine.latency_stats()}
+        if request.path not in ("/query", "/feedback"):
+            raise HTTPError(404, "Not found")
+        if request.method != "POST":
+            raise HTTPError(405, "Use POST")
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Body must be JSON")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Body must be a JSON object")
+        session_id = str(data.get("session_id") or uuid.uuid4().hex)
+
+        if request.path == "/query":
+            question = str(data.get("question", "")).strip()
+            if not question:
+                raise HTTPError(400, "Missing 'question'")
+            answer = await self._answer(question, session_id)
+            answer_id = uuid.uuid4().hex
+            self.answered[answer_id] = question
+            if len(self.answered) > MAX_ANSWER_IDS:
+                self.answered.popitem(last=False)
+            return 200, {"answer": answer, "session_id": session_id, "answer_id": answer_id}
+
+        feedback = data.get("feedback")
+        if feedback not in ("positive", "negative"):
+            raise HTTPError(400, "'feedback' must be 'positive' or 'negative'")
+        answer_id = data.get("answer_id")
+        if answer_id is not None:
+            # The question the rated answer replied to, which need not be the session's latest.
+            answer_id = str(answer_id)
+            question = self.answered.get(answer_id, "N/A")
+        else:
+            question = self.engine.last_question(session_id) or "N/A"
+            answer_id = (session_id, question)
+        # Queued for the writer thread; repeated clicks on the same answer are dropped.
+        self.feedback_writer.log(question, feedback, answer_id=answer_id)
+        return 200, {"ok": True}
+
+    async def _answer(self, question, session_id):
+        try:
+            return await self.batcher.answer(question, session_id)
+        except Overloaded:
+            raise HTTPError(503, "Server busy, please retry")
+
+    async def _send_json(self, writer, status, payload, keep_alive):
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        head = [
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            "Access-Control-Allow-Origin: *",
+            "Access-Control-Allow-Headers: Content-Type",
+            "Access-Control-Allow-Methods: GET, POST, OPTIONS",
+            "Connection: " + ("keep-alive" if keep_alive else "close"),
+        ]
+        if status == 503:
+            head.append("Retry-After: 1")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    # --- WebSocket (RFC 6455) ---
+    async def _serve_websocket(self, request, reader, writer):
+        """Completes the upgrade handshake and answers each text message as a chat turn."""
+        key = request.headers.get("sec-websocket-key", "")
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode("ascii")).digest()).decode("ascii")
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+        session_id = (request.query.get("session_id") or [uuid.uuid4().hex])[0]
+        try:
+            while True:
+                opcode, payload = await self._read_message(reader, writer)
+                if opcode == 0x8:
+                    writer.write(self._frame(0x8, payload[:2]))
+                    await writer.drain()
+                    return
+                if opcode != 0x1:
+                    continue
+                question = payload.decode("utf-8", "replace").strip()
+                if question.startswith("{"):
+                    try:
+                        question = str(json.loads(question).get("question", "")).strip()
+                    except (ValueError, AttributeError):
+                        pass
+                if not question:
+                    reply = {"error": "Empty question"}
+                else:
+                    try:
+                        reply = {"answer": await self.batcher.answer(question, session_id)}
+                    except Overloaded:
+                        reply = {"error": "Server busy, please retry"}
+                writer.write(self._frame(0x1, json.dumps(reply).encode("utf-8")))
+                await writer.drain()
+        finally:
+            self.engine.clear_history(session_id)
+
+    async def _read_message(self, reader, writer):
+        """Returns the next (opcode, payload) data or close message, answering pings on the way."""
+        fragments, message_opcode = [], None
+        total = 0
+        while True:
+            first, second = await reader.readexactly(2)
+            fin, opcode = first & 0x80, first & 0x0F
+            length = second & 0x7F
+            if length == 126:
+                length, = struct.unpack("!H", await reader.readexactly(2))
+            elif length == 127:
+                length, = struct.unpack("!Q", await reader.readexactly(8))
+            total += length
+            if total > MAX_BODY_BYTES:
+                # 1009: message too big.
+                return 0x8, struct.pack("!H", 1009)
+            mask = await reader.readexactly(4) if second & 0x80 else None
+            payload = await reader.readexactly(length)
+            if mask:
+                payload = self._unmask(payload, mask)
+            if opcode == 0x9:
+                writer.write(self._frame(0xA, payload))
+                continue
+            if opcode == 0xA:
+                continue
+            if opcode == 0x8:
+                return opcode, payload
+            if opcode != 0x0:
+                message_opcode = opcode
+            fragments.append(payload)
+            if fin:
+                return message_opcode, b"".join(fragments)
+
+    @staticmethod
+    def _unmask(payload, mask):
+        """XORs a client payload with its 4-byte mask, a machine word at a time."""
+        key = (mask * (len(payload) // 4 + 1))[:len(payload)]
+        return (int.from_bytes(payload, "big") ^ int.from_bytes(key, "big")).to_bytes(len(payload), "big")
+
+    @staticmethod
+    def _frame(opcode, payload):
+        """Builds a single unmasked server frame."""
+        length = len(payload)
+        if length < 126:
+            header = struct.pack("!BB", 0x80 | opcode, length)
+        elif length < 1 << 16:
+            header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+        return header + payload
+
+
+async def serve(engine, host, port, workers, window, max_batch, max_pending):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        batcher = MicroBatcher(engine, executor, window, max_batch, max_pending)
+        feedback_writer = FeedbackWriter("feedback_log.json")
+        chat_server = ChatServer(engine, batcher, feedback_writer)
+        try:
+            server = await asyncio.start_server(chat_server.handle_connection, host, port)
+            print(f"Serving on http://{host}:{port}")
+            async with server:
+                await server.serve_forever()
+        finally:
+            feedback_writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the FAQ engine over HTTP and WebSocket.")
+    parser.add_argument("--faq", default="FAQ", help="FAQ JSON file or directory to load (default: FAQ).")
+    parser.add_argument("--model", help="Precompiled artifact from build_model.py, used if it matches the FAQ file.")
+    parser.add_argument("--backend", default="tfidf", choices=sorted(SCORERS), help="Retrieval backend (default: tfidf).")
+    parser.add_argument("--no-watch", action="store_true", help="Do not reload the FAQ data when it changes.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=2, help="Scoring threads (default: 2).")
+    parser.add_argument("--batch-window-ms", type=float, default=5.0, help="How long questions are collected per batch.")
+    parser.add_argument("--max-batch", type=int, default=256, help="Questions answered per batch at most.")
+    parser.add_argument("--max-pending", type=int, default=1024, help="Queued questions before returning 503.")
+    parser.add_argument("--stats-interval", type=float, default=60.0,
+                        help="Seconds between latency summary lines; 0 disables them (default: 60).")
+    parser.add_argument("--profile-every", type=int, default=0, help="Profile every Nth engine call with cProfile.")
+    parser.add_argument("--profile-dir", default="profiles", help="Where profiles are written (default: profiles).")
+    args = parser.parse_args(argv)
+
+    try:
+        check_nltk_data()
+    except LookupError:
+        sys.exit("A required NLTK dataset is missing. Please run `python download_data.py` first.")
+
+    instrumentation = Instrumentation(log_interval=args.stats_interval, profile_every=args.profile_every,
+                                      profile_dir=args.profile_dir)
+    engine = EnhancedNLPEngine(load_knowledge_base(args.faq), backend=args.backend, artifact_path=args.model,
+                               instrumentation=instrumentation)
+    # NLTK's lazy loaders (Punkt, WordNet) are not thread-safe, so they are loaded
+    # here before several scoring threads can hit them at once.
+    list(engine.get_top_answers_batch(["warm up"]))
+    watcher = None if args.no_watch else KnowledgeBaseWatcher(engine, args.faq).start()
+    try:
+        asyncio.run(serve(engine, args.host, args.port, args.workers,
+                          args.batch_window_ms / 1000, args.max_batch, args.max_pending))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if watcher is not None:
+            watcher.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# sessions.py
+# Per-session conversation context for the engine, so one loaded engine can
+# serve many concurrent conversations.
+
+import threading
+import time
+from collections import OrderedDict, deque
+
+# Session used when callers do not pass a session id (e.g. the desktop GUI).
+DEFAULT_SESSION = "default"
+
+
+class Session:
+    """The most recent turns of one conversation, as (question, vector, terms, vectorizer) tuples.
+
+    vector is None for turns that were answered from the answer cache;
+    vectorizer is the one that produced it, so it can be recomputed after a refit.
+    """
+
+    def __init__(self, max_turns):
+        self.turns = deque(maxlen=max_turns)
+        self.last_access = time.monotonic()
+
+
+# --- Session Store ---
+# Sessions are kept in least-recently-used order. Every access first drops
+# sessions idle for longer than ttl seconds, then the oldest sessions beyond
+# max_sessions. All methods take the store lock, so worker threads and the
+# GUI thread can share one store.
+class SessionStore:
+    def __init__(self, max_turns=2, ttl=1800.0, max_sessions=10000):
+        self.max_turns = max_turns
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def _evict(self, now):
+        """Drops expired sessions, then the least recently used ones over capacity."""
+        sessions = self._sessions
+        while sessions:
+            oldest = next(iter(sessions.values()))
+            if now - oldest.last_access <= self.ttl:
+                break
+            sessions.popitem(last=False)
+        while len(sessions) > self.max_sessions:
+            sessions.popitem(last=False)
+
+    def _touch(self, session_id, create):
+        """Returns the session and marks it as used, or None if it does not exist and create is false."""
+        now = time.monotonic()
+        self._evict(now)
+        session = self._sessions.get(session_id)
+        if session is None:
+            if not create:
+                return None
+            session = self._sessions[session_id] = Session(self.max_turns)
+        else:
+            self._sessions.move_to_end(session_id)
+        session.last_access = now
+        return session
+
+    def recent_turns(self, session_id):
+        """Returns the session's recent (question, vector, terms, vectorizer) tuples, oldest first."""
+        with self._lock:
+            session = self._touch(session_id, create=False)
+            return list(session.turns) if session else []
+
+    def add_turn(self, session_id, question, vector, terms, vectorizer=None):
+        """Appends a turn, dropping the oldest one once the ring buffer is full."""
+        with self._lock:
+            self._touch(session_id, create=True).turns.append((question, vector, terms, vectorizer))
+
+    def last_question(self, session_id):
+        """Returns the session's most recent question, or None."""
+        with self._lock:
+            session = self._touch(session_id, create=False)
+            return session.turns[-1][0] if session and session.turns else None
+
+    def clear(self, session_id):
+        """Forgets a session entirely."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
@@ -0,0 +1,177 @@
+# sharding.py
+# Spreads batch answering over a pool of worker processes so that Python-level
+# preprocessing is not limited to one core by the GIL.
+#
+# The FAQ matrix and the vectorizer state are copied once into a shared memory
+# block. Each worker attaches to it on first use, preprocesses a slice of every
+# chunk of questions, and scores all queries against its own row range of the
+# FAQ matrix; the parent merges the per-shard top-k lists.
+
+import heapq
+import os
+from itertools import chain, islice
+from multiprocessing import Pool, resource_tracker, shared_memory
+
+import numpy as np
+from scipy.sparse import csr_matrix, vstack
+
+from nlp_engine import EnhancedNLPEngine
+from retrieval import SCORERS
+from text_processing import analyze_tokens, worker_preprocessor
+
+
+# Backends whose per-shard scores are comparable, so that shard top-k lists can
+# be merged. The dense backend fits its embedding to the FAQs it indexes, so a
+# score from one shard means nothing next to a score from another.
+SHARDABLE = ("inverted", "tfidf")
+
+
+class SharedArrays:
+    """Copies named numpy arrays into one shared memory block.
+
+    handle is a small picklable (name, layout) pair that workers pass to
+    attach_arrays() to get zero-copy views of the same arrays.
+    """
+
+    def __init__(self, arrays):
+        layout, offset = [], 0
+        arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+        for name, array in arrays.items():
+            offset = -(-offset // 8) * 8
+            layout.append((name, array.dtype.str, array.shape, offset))
+            offset += array.nbytes
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for name, dtype, shape, start in layout:
+            np.ndarray(shape, dtype, buffer=self.shm.buf, offset=start)[...] = arrays[name]
+        self.handle = (self.shm.name, layout)
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def attach_arrays(handle):
+    """Returns (shared memory, {name: array view}) for a SharedArrays handle."""
+    name, layout = handle
+    shm = shared_memory.SharedMemory(name=name)
+    arrays = {key: np.ndarray(shape, dtype, buffer=shm.buf, offset=start) for key, dtype, shape, start in layout}
+    return shm, arrays
+
+
+# --- Worker side ---
+# Attached blocks, keyed by shared memory name; each worker fills this lazily.
+_attached = {}
+
+
+def _worker_state(handle):
+    """Attaches to the shared FAQ model once per worker process."""
+    state = _attached.get(handle[0])
+    if state is None:
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        shm, arrays = attach_arrays(handle)
+        terms = arrays["terms"].tobytes().decode("utf-8").split("\n")
+        vectorizer = TfidfVectorizer(analyzer=analyze_tokens, vocabulary={term: i for i, term in enumerate(terms)})
+        vectorizer.idf_ = arrays["idf"]
+        state = _attached[handle[0]] = {"shm": shm, "arrays": arrays, "vectorizer": vectorizer, "scorers": {}}
+    return state
+
+
+def _vectorize_chunk(args):
+    """Preprocesses a slice of questions and returns their TF-IDF matrix."""
+    handle, tokenizer, stop_words, texts = args
+    preprocess = worker_preprocessor(tokenizer, stop_words)
+    return _worker_state(handle)["vectorizer"].transform([preprocess(text) for text in texts])
+
+
+def _search_shard(args):
+    """Scores query rows against FAQ rows [start, end) and returns global (index, score) lists."""
+    handle, backend, start, end, query_vectors, top_k = args
+    state = _worker_state(handle)
+    scorer = state["scorers"].get((backend, start, end))
+    if scorer is None:
+        arrays = state["arrays"]
+        indptr = arrays["indptr"]
+        lo, hi = indptr[start], indptr[end]
+        # data and indices are views into shared memory; only the row pointers are copied.
+        shard = csr_matrix((arrays["data"][lo:hi], arrays["indices"][lo:hi], indptr[start:end + 1] - lo),
+                           shape=(end - start, len(arrays["idf"])))
+        scorer = state["scorers"][(backend, start, end)] = SCORERS[backend](shard)
+    return [[(start + i, score) for i, score in matches] for matches in scorer.search_batch(query_vectors, top_k)]
+
+
+# --- Sharded Engine ---
+# Batch-only counterpart of EnhancedNLPEngine.get_top_answers_batch. The pool
+# is created before training so that it can also preprocess the FAQ questions.
+class ShardedEngine:
+    def __init__(self, faq_data, workers=None, backend="tfidf", artifact_path=None, tokenizer="punkt"):
+        if backend not in SHARDABLE:
+            raise ValueError(f"Backend {backend!r} cannot be sharded; expected one of {list(SHARDABLE)}")
+        self.workers = workers or os.cpu_count() or 1
+        self.backend = backend
+        self.tokenizer = tokenizer
+        if os.name == "posix":
+            # Forked workers must share the parent's tracker, or each would
+            # unlink the shared block as a leak when it exits.
+            resource_tracker.ensure_running()
+        self.pool = Pool(self.workers)
+        try:
+            self.engine = EnhancedNLPEngine(faq_data, backend=backend, artifact_path=artifact_path,
+                                            tokenizer=tokenizer, pool=self.pool)
+            vectors = self.engine.faq_vectors.tocsr()
+            terms = "\n".join(self.engine.vectorizer.get_feature_names_out()).encode("utf-8")
+            self.shared = SharedArrays({
+                "data": vectors.data,
+                "indices": vectors.indices,
+                "indptr": vectors.indptr,
+                "idf": self.engine.vectorizer.idf_,
+                "terms": np.frombuffer(terms, dtype=np.uint8),
+            })
+        except BaseException:
+            self.pool.terminate()
+            raise
+        self.stop_words = frozenset(self.engine.stop_words)
+        bounds = np.linspace(0, vectors.shape[0], self.workers + 1).astype(int)
+        self.shards = [(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Stops the workers and releases the shared memory block."""
+        self.pool.close()
+        self.pool.join()
+        self.shared.close()
+
+    def get_top_answers_batch(self, questions, top_k=1, chunk_size=1024):
+        """Yields the top-k (answer, score) pairs for each question in an iterable.
+
+        Same results as EnhancedNLPEngine.get_top_answers_batch; each chunk is
+        split across the workers for preprocessing and then scored shard by shard.
+        """
+        top_k = max(1, min(top_k, len(self.engine.answers)))
+        questions = iter(questions)
+        while True:
+            chunk = list(islice(questions, chunk_size))
+            if not chunk:
+                return
+            for row in self._score_chunk(chunk, top_k):
+                yield row
+
+    def _score_chunk(self, chunk, top_k):
+        """Fans a chunk out to the workers and merges the per-shard top-k lists."""
+        handle = self.shared.handle
+        step = -(-len(chunk) // self.workers)
+        slices = [(handle, self.tokenizer, self.stop_words, chunk[i:i + step]) for i in range(0, len(chunk), step)]
+        query_vectors = vstack(self.pool.map(_vectorize_chunk, slices), format="csr")
+        shard_results = self.pool.map(
+            _search_shard, [(handle, self.backend, lo, hi, query_vectors, top_k) for lo, hi in self.shards])
+        answers = self.engine.answers
+        results = []
+        for matches in zip(*shard_results):
+            # Ties go to the lower index, as in the single-process scorers.
+            best = heapq.nlargest(top_k, chain(*matches), key=lambda match: (match[1], -match[0]))
+            results.append([(answers[i], score) for i, score in best])
+        return results
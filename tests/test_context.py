@@ -0,0 +1,32 @@
+# tests/test_context.py
+# Regression tests for conversation context across knowledge base updates.
+#
+# Run from the repository root:
+#   python -m unittest discover tests
+
+import unittest
+
+from nlp_engine import EnhancedNLPEngine, check_nltk_data
+
+try:
+    check_nltk_data()
+    NLTK_DATA_MISSING = False
+except LookupError:
+    NLTK_DATA_MISSING = True
+
+
+@unittest.skipIf(NLTK_DATA_MISSING, "NLTK data is missing; run `python download_data.py` first.")
+class ContextAfterRefitTest(unittest.TestCase):
+    def test_context_is_revectorized_after_refit(self):
+        # After the refit the vocabulary has the same size, but "apple"'s column now means "aardvark".
+        engine = EnhancedNLPEngine([{"question": "apple banana", "answer": "A"},
+                                    {"question": "cherry grape", "answer": "B"}], tokenizer="regex")
+        self.assertEqual(engine.get_most_similar_answer("apple", session_id="s"), "A")
+        status = engine.update_faqs([{"question": "aardvark banana", "answer": "A2"},
+                                     {"question": "cherry grape", "answer": "B"}])
+        self.assertEqual(status, "refit")
+        self.assertEqual(engine.get_most_similar_answer("zzz", session_id="s"), engine.get_fallback_response())
+
+
+if __name__ == "__main__":
+    unittest.main()
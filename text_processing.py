@@ -0,0 +1,106 @@
+# text_processing.py
+# Tokenizers and helpers for the engine's preprocessing pipeline.
+
+import re
+from functools import lru_cache
+
+# Separators the Treebank tokenizer behind nltk.word_tokenize splits on.
+# Commas and colons between digits (1,000 or 10:30) stay inside the token.
+_SEPARATORS = re.compile(r"[\s;@#$%&?!()\[\]{}<>\"`]+|--|(?<!\d),|,(?!\d)|:(?!\d)")
+_CLITIC = re.compile(r"(?:n't|'s|'m|'re|'ve|'ll|'d)$")
+_EDGE_PUNCTUATION = ".'"
+# Fused forms the Treebank tokenizer splits into two words (its CONTRACTIONS2).
+# Its CONTRACTIONS3 ('tis, 'twas) never fires: the quote is split off first.
+_CONTRACTIONS = {
+    "cannot": ["can", "not"], "d'ye": ["d", "'ye"], "gimme": ["gim", "me"], "gonna": ["gon", "na"],
+    "gotta": ["got", "ta"], "lemme": ["lem", "me"], "more'n": ["more", "'n"], "wanna": ["wan", "na"],
+}
+
+
+def regex_word_tokenize(text):
+    """A fast approximation of nltk.word_tokenize for lower-cased text.
+
+    Only alphanumeric tokens survive preprocessing, so this only has to agree
+    with Punkt/Treebank on those: separators are split off, clitics such as
+    "n't" and "'s" are detached, fused forms such as "cannot" and "gonna" are
+    split in two, and anything still containing punctuation
+    (URLs, hyphenated words, phone numbers) is kept whole so that it is
+    dropped exactly like word_tokenize's single token would be.
+    """
+    tokens = []
+    for piece in _SEPARATORS.split(text):
+        contraction = _CONTRACTIONS.get(piece.rstrip("."))
+        if contraction:
+            tokens.extend(contraction)
+            continue
+        piece = piece.strip(_EDGE_PUNCTUATION)
+        if not piece:
+            continue
+        clitic = _CLITIC.search(piece)
+        if clitic:
+            tokens.append(piece[:clitic.start()])
+            tokens.append(clitic.group())
+        else:
+            tokens.append(piece)
+    return tokens
+
+
+def punkt_word_tokenize(text):
+    """nltk.word_tokenize, imported on first use since importing NLTK takes about a second."""
+    from nltk import word_tokenize
+    return word_tokenize(text)
+
+
+# Tokenizers selectable through EnhancedNLPEngine(tokenizer=...).
+TOKENIZERS = {
+    "punkt": punkt_word_tokenize,
+    "regex": regex_word_tokenize,
+}
+
+
+def analyze_tokens(tokens):
+    """TfidfVectorizer analyzer for documents that are already token lists.
+
+    Drops single-character tokens, as the default token_pattern does when a
+    joined string is re-split, so vocabularies are identical either way.
+    """
+    return [t for t in tokens if len(t) > 1]
+
+
+def preprocess_tokens(text, tokenize, stop_words, lemmatize):
+    """Tokenizes, lemmatizes, and removes stop words from text, returning a token list."""
+    return lemmatize_tokens(tokenize(text.lower()), stop_words, lemmatize)
+
+
+def lemmatize_tokens(tokens, stop_words, lemmatize):
+    """The second half of preprocess_tokens: drops punctuation and stop words and lemmatizes the rest."""
+    return [lemmatize(w) for w in tokens if w.isalnum() and w not in stop_words]
+
+
+# Per-process preprocessing functions for pool workers, keyed by (tokenizer, stop words).
+_worker_preprocessors = {}
+
+
+def worker_preprocessor(tokenizer, stop_words, lemma_cache_size=100000):
+    """Returns this process's preprocess(text) function for the given settings."""
+    key = (tokenizer, stop_words)
+    preprocess = _worker_preprocessors.get(key)
+    if preprocess is None:
+        from nltk.stem import WordNetLemmatizer
+        tokenize = TOKENIZERS[tokenizer]
+        lemmatize = lru_cache(maxsize=lemma_cache_size)(WordNetLemmatizer().lemmatize)
+        preprocess = _worker_preprocessors[key] = lambda text: preprocess_tokens(text, tokenize, stop_words, lemmatize)
+    return preprocess
+
+
+def _preprocess_chunk(args):
+    tokenizer, stop_words, texts = args
+    preprocess = worker_preprocessor(tokenizer, stop_words)
+    return [preprocess(text) for text in texts]
+
+
+def parallel_preprocess(pool, texts, stop_words, tokenizer="punkt", chunk_size=1000):
+    """Preprocesses texts on a multiprocessing pool, returning token lists in order."""
+    stop_words = frozenset(stop_words)
+    chunks = [(tokenizer, stop_words, texts[i:i + chunk_size]) for i in range(0, len(texts), chunk_size)]
+    return [tokens for chunk in pool.imap(_preprocess_chunk, chunks) for tokens in chunk]
@@ -0,0 +1,301 @@
+# transcript.py
+# A virtualized chat transcript drawn straight onto a Tk Canvas.
+#
+# Messages are kept as plain records with a cached height. Only the messages
+# near the viewport have canvas items, and those items are recycled as the
+# view scrolls, so the cost of drawing, scrolling and resizing depends on the
+# window size rather than on the length of the conversation.
+
+import tkinter as tk
+import tkinter.font as tkfont
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import count
+from textwrap import wrap
+
+# Layout in pixels, matching the padding of the original Label-based bubbles.
+OUTER_PAD_X = 10
+OUTER_PAD_Y = 5
+BUBBLE_PAD_X = 10
+BUBBLE_PAD_Y = 5
+TIME_GAP = 2
+FEEDBACK_PAD = 5
+# Messages within this distance of the viewport are drawn too, so that slow scrolling never shows a gap.
+OVERSCAN = 400
+# Resizes are handled once the window has stopped changing size for this long.
+RESIZE_DELAY_MS = 80
+
+
+class Message:
+    """One transcript entry and its cached layout."""
+
+    def __init__(self, message_id, sender, text, timestamp, show_feedback):
+        self.id = message_id
+        self.sender = sender
+        self.is_user = sender == "You"
+        # Same pre-wrapping as the original labels; long lines are wrapped again by the canvas.
+        self.text = "\n".join(wrap(text, width=60)) or text
+        self.timestamp = timestamp
+        self.show_feedback = show_feedback
+        self.feedback_given = False
+        self.line_widths = None
+        self.height = 0
+
+
+class ChatTranscript(tk.Frame):
+    def __init__(self, master, bg, user_color, bot_color, text_color, font, font_small, on_feedback=None):
+        super().__init__(master, bg=bg)
+        self.bg = bg
+        self.user_color = user_color
+        self.bot_color = bot_color
+        self.text_color = text_color
+        self.on_feedback = on_feedback
+        self.font = tkfont.Font(font=font)
+        self.font_small = tkfont.Font(font=font_small)
+        self.font_italic = tkfont.Font(font=font)
+        self.font_italic.configure(slant="italic")
+        self.line_height = self.font.metrics("linespace")
+        self.small_height = self.font_small.metrics("linespace")
+
+        self.canvas = tk.Canvas(self, bg=bg, highlightthickness=0)
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_yscroll)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.canvas.bind("<Configure>", self._on_configure)
+
+        self.messages = []
+        # offsets[i] is the top of message i; offsets[-1] is the height of the whole transcript.
+        self.offsets = [0]
+        self._ids = count()
+        self._rendered = {}
+        self._free_slots = []
+        self._typing_items = None
+        self._width = 0
+        self._resize_job = None
+        self._render_job = None
+        self._scroll_to_end = False
+
+    # --- Public API ---
+    def add_message(self, sender, text, show_feedback=False):
+        """Appends a message and scrolls to it; returns the message id."""
+        message = Message(next(self._ids), sender, text, datetime.now().strftime('%H:%M'), show_feedback)
+        message.line_widths = [self.font.measure(line) for line in message.text.split("\n")]
+        message.height = self._estimate_height(message)
+        self.messages.append(message)
+        self.offsets.append(self.offsets[-1] + message.height)
+        self._update_scrollregion()
+        self._scroll_to_end = True
+        self._schedule_render()
+        return message.id
+
+    def show_typing(self, text="Bot is typing..."):
+        """Shows a transient bot bubble below the last message."""
+        if self._typing_items is None:
+            rect = self.canvas.create_rectangle(0, 0, 0, 0, fill=self.bot_color, width=0)
+            label = self.canvas.create_text(0, 0, text=text, anchor="nw", font=self.font_italic, fill=self.text_color)
+            self._typing_items = (rect, label)
+        self._place_typing()
+        self._update_scrollregion()
+        self._scroll_to_end = True
+        self._schedule_render()
+
+    def hide_typing(self):
+        if self._typing_items is not None:
+            for item in self._typing_items:
+                self.canvas.delete(item)
+            self._typing_items = None
+            self._update_scrollregion()
+
+    def clear(self):
+        """Removes every message and canvas item."""
+        self.canvas.delete("all")
+        self.messages = []
+        self.offsets = [0]
+        self._rendered = {}
+        self._free_slots = []
+        self._typing_items = None
+        self._update_scrollregion()
+
+    # --- Layout ---
+    def _wrap_width(self):
+        # Same limits as the original wraplength: the canvas width minus 40, at least 100.
+        return max(self._width - 40, 100) if self._width > 1 else 300
+
+    def _fixed_height(self, message):
+        """Height of everything in a message slot except the wrapped text."""
+        height = 2 * OUTER_PAD_Y + 2 * BUBBLE_PAD_Y + TIME_GAP + self.small_height
+        if message.show_feedback:
+            height += self.line_height + FEEDBACK_PAD
+        return height
+
+    def _estimate_height(self, message):
+        """Height of a message slot, counting each explicit line's wrapped lines from its measured width."""
+        wrap_width = self._wrap_width()
+        lines = sum(max(1, -(-width // wrap_width)) for width in message.line_widths)
+        return self._fixed_height(message) + lines * self.line_height
+
+    def _relayout(self, start=0):
+        """Recomputes the offsets of messages from start onwards."""
+        offsets = self.offsets
+        del offsets[start + 1:]
+        total = offsets[start]
+        for message in self.messages[start:]:
+            total += message.height
+            offsets.append(total)
+        self._update_scrollregion()
+
+    def _update_scrollregion(self):
+        height = self.offsets[-1] + self._typing_height()
+        self.canvas.configure(scrollregion=(0, 0, self._width, max(height, self.canvas.winfo_height())))
+
+    def _typing_height(self):
+        if self._typing_items is None:
+            return 0
+        return 2 * OUTER_PAD_Y + self.line_height + 2 * BUBBLE_PAD_Y
+
+    def _place_typing(self):
+        rect, label = self._typing_items
+        y = self.offsets[-1] + OUTER_PAD_Y
+        self.canvas.coords(label, OUTER_PAD_X + BUBBLE_PAD_X, y + BUBBLE_PAD_Y)
+        x0, _, x1, _ = self.canvas.bbox(label)
+        self.canvas.coords(rect, x0 - BUBBLE_PAD_X, y, x1 + BUBBLE_PAD_X, y + self.line_height + 2 * BUBBLE_PAD_Y)
+
+    # --- Events ---
+    def _on_configure(self, event):
+        """Debounces resizes; the visible bubbles are re-wrapped once the size settles."""
+        if not self._width:
+            self._apply_resize(event.width)
+            return
+        if self._resize_job is not None:
+            self.after_cancel(self._resize_job)
+        self._resize_job = self.after(RESIZE_DELAY_MS, self._apply_resize, event.width)
+
+    def _apply_resize(self, width):
+        self._resize_job = None
+        at_end = self.canvas.yview()[1] >= 1.0
+        first_visible = self.canvas.canvasy(0)
+        self._width = width
+        for message in self.messages:
+            message.height = self._estimate_height(message)
+        self._relayout()
+        for index in list(self._rendered):
+            self._release(index)
+        if at_end:
+            self._scroll_to_end = True
+        elif self.offsets[-1]:
+            self.canvas.yview_moveto(first_visible / max(self.offsets[-1], 1))
+        self._schedule_render()
+
+    def _on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._schedule_render()
+
+    def _schedule_render(self):
+        if self._render_job is None:
+            self._render_job = self.after_idle(self._render)
+
+    # --- Rendering ---
+    def _render(self):
+        """Draws the messages near the viewport and recycles the items of the others."""
+        self._render_job = None
+        if self._typing_items is not None:
+            self._place_typing()
+        if self._scroll_to_end:
+            self._scroll_to_end = False
+            self.canvas.yview_moveto(1.0)
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        first = max(bisect_right(self.offsets, top - OVERSCAN) - 1, 0)
+        last = min(bisect_left(self.offsets, bottom + OVERSCAN), len(self.messages))
+        for index in list(self._rendered):
+            if not first <= index < last:
+                self._release(index)
+        grown_from = None
+        for index in range(first, last):
+            if index not in self._rendered:
+                self._rendered[index] = slot = self._acquire()
+                if self._draw(index, slot) and grown_from is None:
+                    grown_from = index
+        if grown_from is not None:
+            # A bubble wrapped onto more lines than estimated; shift everything below it.
+            for index in [i for i in self._rendered if i > grown_from]:
+                self._release(index)
+            self._relayout(grown_from)
+            self._schedule_render()
+
+    def _acquire(self):
+        if self._free_slots:
+            return self._free_slots.pop()
+        canvas = self.canvas
+        slot = {
+            "bubble": canvas.create_rectangle(0, 0, 0, 0, width=0),
+            "text": canvas.create_text(0, 0, font=self.font, fill=self.text_color, justify="left"),
+            "time": canvas.create_text(0, 0, font=self.font_small, fill="#888"),
+            "like": canvas.create_text(0, 0, text="👍", font=self.font, anchor="nw"),
+            "dislike": canvas.create_text(0, 0, text="👎", font=self.font, anchor="nw"),
+            "thanks": canvas.create_text(0, 0, text="Thanks for your feedback!", font=self.font_small,
+                                         fill="#888", anchor="nw"),
+            "index": None,
+        }
+        canvas.tag_bind(slot["like"], "<Button-1>", lambda e: self._give_feedback(slot, "positive"))
+        canvas.tag_bind(slot["dislike"], "<Button-1>", lambda e: self._give_feedback(slot, "negative"))
+        for name in ("like", "dislike"):
+            canvas.tag_bind(slot[name], "<Enter>", lambda e: canvas.configure(cursor="hand2"))
+            canvas.tag_bind(slot[name], "<Leave>", lambda e: canvas.configure(cursor=""))
+        return slot
+
+    def _release(self, index):
+        slot = self._rendered.pop(index)
+        slot["index"] = None
+        for name in ("bubble", "text", "time", "like", "dislike", "thanks"):
+            self.canvas.itemconfigure(slot[name], state="hidden")
+        self._free_slots.append(slot)
+
+    def _draw(self, index, slot):
+        """Positions a slot's items for a message; returns True if the message grew taller than estimated."""
+        canvas, message = self.canvas, self.messages[index]
+        slot["index"] = index
+        y = self.offsets[index] + OUTER_PAD_Y
+        if message.is_user:
+            x, anchor, color = self._width - OUTER_PAD_X - BUBBLE_PAD_X, "ne", self.user_color
+        else:
+            x, anchor, color = OUTER_PAD_X + BUBBLE_PAD_X, "nw", self.bot_color
+        canvas.itemconfigure(slot["text"], text=message.text, width=self._wrap_width(), anchor=anchor, state="normal")
+        canvas.coords(slot["text"], x, y + BUBBLE_PAD_Y)
+        x0, y0, x1, y1 = canvas.bbox(slot["text"])
+        text_height = y1 - y0
+        canvas.itemconfigure(slot["bubble"], fill=color, state="normal")
+        canvas.coords(slot["bubble"], x0 - BUBBLE_PAD_X, y, x1 + BUBBLE_PAD_X, y + text_height + 2 * BUBBLE_PAD_Y)
+
+        time_y = y + text_height + 2 * BUBBLE_PAD_Y + TIME_GAP
+        time_x = x + BUBBLE_PAD_X - 5 if message.is_user else x - BUBBLE_PAD_X + 5
+        canvas.itemconfigure(slot["time"], text=message.timestamp, anchor=anchor, state="normal")
+        canvas.coords(slot["time"], time_x, time_y)
+
+        feedback_y = time_y + self.small_height
+        buttons = "normal" if message.show_feedback and not message.feedback_given else "hidden"
+        canvas.itemconfigure(slot["like"], state=buttons)
+        canvas.itemconfigure(slot["dislike"], state=buttons)
+        canvas.coords(slot["like"], OUTER_PAD_X, feedback_y)
+        canvas.coords(slot["dislike"], OUTER_PAD_X + self.font.measure("👍") + 4, feedback_y)
+        canvas.itemconfigure(slot["thanks"], state="normal" if message.feedback_given else "hidden")
+        canvas.coords(slot["thanks"], OUTER_PAD_X, feedback_y)
+
+        # The estimate can fall short when word wrapping leaves ragged lines.
+        if text_height > message.height - self._fixed_height(message):
+            message.height = self._fixed_height(message) + text_height
+            return True
+        return False
+
+    def _give_feedback(self, slot, feedback_type):
+        index = slot["index"]
+        if index is None:
+            return
+        message = self.messages[index]
+        if message.feedback_given:
+            return
+        message.feedback_given = True
+        self._draw(index, slot)
+        if self.on_feedback is not None:
+            self.on_feedback(message.id, feedback_type)